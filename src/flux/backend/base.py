@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from contextlib import asynccontextmanager
 
 from flux.backend.applied_migration import AppliedMigration
+from flux.backend.explained_statement import ExplainedStatement
+from flux.backend.lock_impact import LockImpact
 from flux.config import FluxConfig
 from flux.migration.migration import Migration
 
@@ -35,6 +37,9 @@ class MigrationBackend(ABC):
 
         This lock should last as long as the context manager and should operate
         will be within ``connection`` but outside of ``transaction``.
+
+        Backends that support a timeout should raise
+        ``MigrationLockTimeoutError`` if the lock can't be acquired in time.
         """
         yield
 
@@ -52,6 +57,42 @@ class MigrationBackend(ABC):
         """
         yield
 
+    @asynccontextmanager
+    async def session_settings(self, settings: dict[str, str], local: bool = True):
+        """
+        Apply session settings, such as memory limits for index builds, while
+        the context manager is active. This will be within ``connection``.
+
+        If ``local``, this will be within ``transaction`` and the settings
+        should only last until the end of it. Otherwise the settings should be
+        reset when the context manager exits.
+
+        Backends without session settings do not need to implement this, but
+        then migrations can't declare settings.
+        """
+        if settings:
+            raise NotImplementedError(
+                f"{type(self).__name__} does not support session settings"
+            )
+        yield
+
+    @asynccontextmanager
+    async def workers(self, count: int):
+        """
+        Open up to ``count`` other backends connected to the same database,
+        yielding them as a list, so that independent repeatable migrations can
+        run concurrently. Each worker is only used by one task at a time and
+        its transactions are independent of this backend's. This will be
+        within ``connection`` and ``migration_lock``.
+
+        Backends that can't run migrations concurrently do not need to
+        implement this, in which case repeatable migrations run serially.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support concurrent migrations"
+        )
+        yield
+
     @abstractmethod
     async def is_initialized(self) -> bool:
         """
@@ -71,6 +112,14 @@ class MigrationBackend(ABC):
         Register a migration as applied (when up-migrated)
         """
 
+    async def register_migrations(self, migrations: list[Migration]):
+        """
+        Register several migrations as applied at once, e.g. when restoring a
+        snapshot. Backends can implement this to do it in a single step.
+        """
+        for migration in migrations:
+            await self.register_migration(migration)
+
     @abstractmethod
     async def unregister_migration(self, migration: Migration):
         """
@@ -90,3 +139,182 @@ class MigrationBackend(ABC):
         """
         Get the set of applied migrations.
         """
+
+    async def get_applied_repeatable_migrations(self, kind: str) -> dict[str, str]:
+        """
+        Get the hashes of repeatable migrations of the given kind
+        (``pre-apply`` or ``post-apply``) as they were last applied, keyed by
+        migration ID.
+
+        Backends that don't track repeatable migrations do not need to
+        implement this, in which case they are always all applied.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support tracking repeatable migrations"
+        )
+
+    async def register_repeatable_migration(self, kind: str, migration: Migration):
+        """
+        Record the hash of a repeatable migration of the given kind
+        (``pre-apply`` or ``post-apply``) when it is applied.
+
+        Must be implemented if ``get_applied_repeatable_migrations`` is.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support tracking repeatable migrations"
+        )
+
+    async def existing_objects(self, objects: list[str]) -> set[str]:
+        """
+        Get which of the given database objects, such as views and functions
+        defined by post-apply migrations, currently exist.
+
+        Backends that can't track dependencies between database objects do not
+        need to implement this, in which case post-apply migrations are run
+        without regard to the objects they define.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support tracking object dependencies"
+        )
+
+    async def dependent_objects(
+        self, contents: list[str], roots: list[str], objects: list[str]
+    ) -> dict[str, int]:
+        """
+        Get which of the given database objects depend, directly or
+        transitively, on the relations touched by the given migration contents
+        or on the given root objects. Returns the depth of each dependent
+        object's dependency, where objects with a greater depth depend on
+        objects with a lesser one.
+
+        Must be implemented if ``existing_objects`` is.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support tracking object dependencies"
+        )
+
+    async def dump_schema(self, include_data: bool = False) -> str:
+        """
+        Dump the schema of the database as statements that recreate it,
+        excluding the backend's own tables, e.g. to squash migrations into a
+        baseline migration. If ``include_data``, the statements also recreate
+        the data in the database's tables.
+
+        Backends that can't dump their schema do not need to implement this,
+        but then migrations can't be squashed.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support dumping the schema"
+        )
+
+    @asynccontextmanager
+    async def template_lock(self):
+        """
+        Create a lock that prevents other processes from building or cloning
+        the template database this backend connects to concurrently. Unlike
+        the other template methods, this is not within ``connection``, as the
+        template database may not exist yet.
+
+        Backends that can't clone databases do not need to implement this,
+        or any of the other template methods, but then template databases
+        can't be used.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+        yield
+
+    async def template_key(self) -> str | None:
+        """
+        Get the key of the migrations the template database was last built
+        with, or None if it doesn't exist or hasn't been built
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+
+    async def reset_template(self):
+        """
+        Drop the template database if it exists and create it again empty
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+
+    async def mark_template(self, key: str):
+        """
+        Record that the template database has been built with the migrations
+        with the given key, so that it can be cloned
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+
+    async def clone_template(self, name: str | None = None) -> str:
+        """
+        Create a new database as a copy of the template database, with the
+        given name or a generated one, returning its connection URI
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+
+    async def drop_clone(self, connection_uri: str):
+        """
+        Drop a database created by ``clone_template``, given its connection
+        URI, if it still exists
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support template databases"
+        )
+
+    async def explain_migration(self, content: str) -> list[ExplainedStatement]:
+        """
+        Estimate the cost of each statement in the content of a migration
+        without applying it.
+
+        Backends that can't estimate statement costs do not need to implement
+        this.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support explaining migrations"
+        )
+
+    async def estimate_lock_impact(self, content: str) -> list[LockImpact]:
+        """
+        Estimate the impact of the table locks taken by each statement in the
+        content of a migration without applying it.
+
+        Backends that can't estimate lock impact do not need to implement
+        this.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support estimating lock impact"
+        )
+
+    async def build_indexes(
+        self, indexes: list[str], settings: dict[str, str] | None = None
+    ):
+        """
+        Build the indexes declared by an index migration, outside of any
+        transaction, with the given session settings. Each index must end up
+        valid.
+
+        Backends that can't build indexes concurrently do not need to
+        implement this, but then index migrations can't be applied.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support index migrations"
+        )
+
+    async def analyze_migrated_tables(self, migrations: list[Migration]) -> list[str]:
+        """
+        Refresh the planner statistics of the tables touched by migrations that
+        have just been applied, returning the names of the analyzed tables.
+
+        Backends that don't keep planner statistics do not need to implement
+        this.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support analyzing migrated tables"
+        )
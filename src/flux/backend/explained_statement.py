@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+
+
+@dataclass(eq=True, frozen=True)
+class ExplainedStatement:
+    """
+    The planner's estimate for a single statement of a migration
+    """
+
+    #: The statement text
+    statement: str
+
+    #: The estimated number of rows produced or affected, if explained
+    estimated_rows: float | None = None
+
+    #: The estimated total cost of the statement, if explained
+    estimated_cost: float | None = None
+
+    #: Why the statement was not explained, if it wasn't
+    skipped_reason: str | None = None
+
+    @property
+    def explained(self) -> bool:
+        return self.skipped_reason is None
@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+
+
+@dataclass(eq=True, frozen=True)
+class LockBlocker:
+    """
+    Information about a database session holding a lock that a migration
+    process is waiting for
+    """
+
+    #: The process ID of the blocking session
+    pid: int
+
+    #: The application name of the blocking session
+    application_name: str | None
+
+    #: The user of the blocking session
+    user: str | None
+
+    #: The state of the blocking session, e.g. "active" or "idle in transaction"
+    state: str | None
+
+    #: The text of the blocking session's current or most recent query
+    query: str | None
+
+    #: How long ago the blocking session's current or most recent query
+    #: started, in seconds
+    query_age: float | None
@@ -0,0 +1,37 @@
+from dataclasses import dataclass
+
+
+@dataclass(eq=True, frozen=True)
+class LockImpact:
+    """
+    The estimated impact of the table lock taken by a single statement of a
+    migration
+    """
+
+    #: The statement text
+    statement: str
+
+    #: The name of the locked table
+    table: str
+
+    #: The lock mode taken on the table
+    lock_mode: str
+
+    #: Whether the lock blocks writes to the table while it is held
+    blocks_writes: bool
+
+    #: Whether the statement rewrites the whole table
+    rewrites: bool
+
+    #: Whether the statement scans the whole table
+    scans: bool
+
+    #: The estimated number of rows in the table, if known
+    estimated_rows: float | None = None
+
+    #: The number of pages the table takes up on disk, if known
+    estimated_pages: int | None = None
+
+    #: The estimated number of bytes rewritten or scanned while holding the
+    #: lock, if known
+    estimated_bytes: int | None = None
@@ -1,10 +1,14 @@
+import asyncio
+import json
+import logging
 import re
-from contextlib import asynccontextmanager
-from dataclasses import dataclass, field
+import time
+import uuid
+from contextlib import AsyncExitStack, asynccontextmanager, suppress
+from dataclasses import dataclass, field, replace
 
 try:
-    import sqlparse
-    from databases import Database
+    from databases import Database, DatabaseURL
     from databases.core import Connection
 except ImportError as e:
     raise ImportError(
@@ -13,14 +17,153 @@ except ImportError as e:
 
 from flux.backend.applied_migration import AppliedMigration
 from flux.backend.base import MigrationBackend
+from flux.backend.explained_statement import ExplainedStatement
+from flux.backend.lock_blocker import LockBlocker
+from flux.backend.lock_impact import LockImpact
+from flux.builtins.postgres_statements import (
+    classify_statement_lock,
+    is_explainable,
+    normalize_identifier,
+    parse_index_definition,
+    split_statements,
+    touched_tables,
+)
 from flux.config import FluxConfig
+from flux.exceptions import (
+    InvalidIndexError,
+    MigrationLockTimeoutError,
+    SchemaDumpError,
+)
 from flux.migration.migration import Migration
 
+logger = logging.getLogger(__name__)
+
 VALID_TABLE_NAME = r"^[A-Za-z0-9_]+$"
+VALID_SETTING_NAME = r"^[A-Za-z_][A-Za-z0-9_$]*(\.[A-Za-z_][A-Za-z0-9_$]*)?$"
 
 DEFAULT_MIGRATIONS_SCHEMA = "public"
 DEFAULT_MIGRATIONS_TABLE = "_flux_migrations"
 DEFAULT_MIGRATIONS_LOCK_ID = 3589
+DEFAULT_MIGRATIONS_LOCK_TIMEOUT = None
+DEFAULT_LOCK_POLL_INTERVAL = 0.5
+DEFAULT_LOCK_WAIT_REPORT_INTERVAL = 5.0
+DEFAULT_ANALYZE_AFTER_APPLY = True
+DEFAULT_ANALYZE_PARALLELISM = 1
+DEFAULT_INDEX_BUILD_PARALLELISM = 4
+DEFAULT_INDEX_BUILD_PARALLELISM_PER_TABLE = 1
+DEFAULT_INDEX_BUILD_ATTEMPTS = 3
+DEFAULT_REPEATABLE_PARALLELISM = 4
+DEFAULT_PG_DUMP_PATH = "pg_dump"
+DEFAULT_MAINTENANCE_DATABASE = "postgres"
+
+#: Prefix of the comment on a template database recording the key of the
+#: migrations it was built with
+TEMPLATE_COMMENT_PREFIX = "flux template "
+
+_DEPENDENT_OBJECTS_QUERY = """
+with recursive dependents(classid, objid, depth) as (
+    select 'pg_class'::regclass, to_regclass(name)::oid, 0
+    from unnest(cast(:names as text[])) as name
+    where to_regclass(name) is not null
+  union all
+    select 'pg_proc'::regclass, to_regproc(name)::oid, 0
+    from unnest(cast(:names as text[])) as name
+    where to_regproc(name) is not null
+  union all
+    select
+        case
+            when d.classid = 'pg_rewrite'::regclass then 'pg_class'::regclass
+            else d.classid::regclass
+        end,
+        case
+            when d.classid = 'pg_rewrite'::regclass then r.ev_class
+            else d.objid
+        end,
+        dependents.depth + 1
+    from dependents
+    join pg_depend d
+        on d.refclassid = dependents.classid and d.refobjid = dependents.objid
+    left join pg_rewrite r
+        on d.classid = 'pg_rewrite'::regclass and r.oid = d.objid
+    where d.classid in ('pg_rewrite'::regclass, 'pg_proc'::regclass)
+    and d.deptype = 'n'
+    and (r.oid is null or r.ev_class <> dependents.objid)
+    and dependents.depth < 32
+)
+select
+    case
+        when classid = 'pg_class'::regclass then objid::regclass::text
+        else objid::regproc::text
+    end,
+    max(depth)
+from dependents
+where depth > 0
+group by 1
+"""
+
+#: Lines of ``pg_dump`` output that configure the restoring session or only
+#: describe the dump
+_DUMP_SESSION_LINE = re.compile(
+    r"^(?:SET |SELECT pg_catalog\.set_config\(|\\|-- Dumped (?:from|by) ).*\n",
+    re.MULTILINE,
+)
+
+_SESSION_INFO_COLUMNS = """
+    a.pid,
+    a.application_name,
+    a.usename,
+    a.state,
+    a.query,
+    extract(epoch from now() - a.query_start)
+"""
+
+
+def _estimated_rows(plan: dict) -> float:
+    """
+    Get the estimated number of rows produced by a plan node, or affected by it
+    for data-modifying statements without a ``returning`` clause
+    """
+    if plan["Node Type"] == "ModifyTable" and plan.get("Plans"):
+        return plan["Plans"][0]["Plan Rows"]
+    return plan["Plan Rows"]
+
+
+def _lock_blocker(row) -> LockBlocker:
+    return LockBlocker(
+        pid=row[0],
+        application_name=row[1],
+        user=row[2],
+        state=row[3],
+        query=row[4],
+        query_age=float(row[5]) if row[5] is not None else None,
+    )
+
+
+def _libpq_url(database_url: str) -> str:
+    """
+    Get a connection URL that libpq tools such as ``pg_dump`` understand from
+    a database URL, which may name a driver (e.g. ``postgresql+aiopg://``)
+    """
+    return re.sub(r"^postgres(?:ql)?(?:\+\w+)?://", "postgresql://", database_url)
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _setting_value(value) -> str:
+    if isinstance(value, bool):
+        return "on" if value else "off"
+    return str(value)
+
+
+def _describe_lock_blockers(blockers: list[LockBlocker]) -> str:
+    return "; ".join(
+        f"pid {blocker.pid} ({blocker.user}, {blocker.application_name!r}, "
+        f"{blocker.state}) running {blocker.query!r} for "
+        f"{blocker.query_age or 0:.1f}s"
+        for blocker in blockers
+    )
 
 
 @dataclass
@@ -29,14 +172,35 @@ class FluxPostgresBackend(MigrationBackend):
     migrations_table: str = DEFAULT_MIGRATIONS_TABLE
     migrations_schema: str = DEFAULT_MIGRATIONS_SCHEMA
     migrations_lock_id: int = DEFAULT_MIGRATIONS_LOCK_ID
+    migrations_lock_timeout: float | None = DEFAULT_MIGRATIONS_LOCK_TIMEOUT
+    lock_poll_interval: float = DEFAULT_LOCK_POLL_INTERVAL
+    lock_wait_report_interval: float = DEFAULT_LOCK_WAIT_REPORT_INTERVAL
+    analyze_after_apply: bool = DEFAULT_ANALYZE_AFTER_APPLY
+    analyze_parallelism: int = DEFAULT_ANALYZE_PARALLELISM
+    default_session_settings: dict[str, str] = field(default_factory=dict)
+    index_build_parallelism: int = DEFAULT_INDEX_BUILD_PARALLELISM
+    index_build_parallelism_per_table: int = DEFAULT_INDEX_BUILD_PARALLELISM_PER_TABLE
+    index_build_attempts: int = DEFAULT_INDEX_BUILD_ATTEMPTS
+    repeatable_parallelism: int = DEFAULT_REPEATABLE_PARALLELISM
+    pg_dump_path: str = DEFAULT_PG_DUMP_PATH
+    maintenance_database: str = DEFAULT_MAINTENANCE_DATABASE
 
     _db: Database = field(init=False, repr=False)
     _conn: Connection = field(init=False, repr=False)
+    _backend_pid: int | None = field(init=False, repr=False, default=None)
 
     @property
     def qualified_migrations_table(self) -> str:
         return f"{self.migrations_schema}.{self.migrations_table}"
 
+    @property
+    def repeatable_migrations_table(self) -> str:
+        return f"{self.migrations_table}_repeatable"
+
+    @property
+    def qualified_repeatable_migrations_table(self) -> str:
+        return f"{self.migrations_schema}.{self.repeatable_migrations_table}"
+
     @classmethod
     def from_config(
         cls, config: FluxConfig, connection_uri: str
@@ -57,11 +221,56 @@ class FluxPostgresBackend(MigrationBackend):
         migrations_schema = config.backend_config.get(
             "migrations_schema", DEFAULT_MIGRATIONS_SCHEMA
         )
+        migrations_lock_timeout = config.backend_config.get(
+            "migrations_lock_timeout", DEFAULT_MIGRATIONS_LOCK_TIMEOUT
+        )
+        lock_poll_interval = config.backend_config.get(
+            "lock_poll_interval", DEFAULT_LOCK_POLL_INTERVAL
+        )
+        lock_wait_report_interval = config.backend_config.get(
+            "lock_wait_report_interval", DEFAULT_LOCK_WAIT_REPORT_INTERVAL
+        )
+        analyze_after_apply = config.backend_config.get(
+            "analyze_after_apply", DEFAULT_ANALYZE_AFTER_APPLY
+        )
+        analyze_parallelism = config.backend_config.get(
+            "analyze_parallelism", DEFAULT_ANALYZE_PARALLELISM
+        )
+        default_session_settings = config.backend_config.get("session_settings", {})
+        index_build_parallelism = config.backend_config.get(
+            "index_build_parallelism", DEFAULT_INDEX_BUILD_PARALLELISM
+        )
+        index_build_parallelism_per_table = config.backend_config.get(
+            "index_build_parallelism_per_table",
+            DEFAULT_INDEX_BUILD_PARALLELISM_PER_TABLE,
+        )
+        index_build_attempts = config.backend_config.get(
+            "index_build_attempts", DEFAULT_INDEX_BUILD_ATTEMPTS
+        )
+        repeatable_parallelism = config.backend_config.get(
+            "repeatable_parallelism", DEFAULT_REPEATABLE_PARALLELISM
+        )
+        pg_dump_path = config.backend_config.get("pg_dump_path", DEFAULT_PG_DUMP_PATH)
+        maintenance_database = config.backend_config.get(
+            "maintenance_database", DEFAULT_MAINTENANCE_DATABASE
+        )
         return cls(
             database_url=connection_uri,
             migrations_table=migrations_table,
             migrations_lock_id=migrations_lock_id,
             migrations_schema=migrations_schema,
+            migrations_lock_timeout=migrations_lock_timeout,
+            lock_poll_interval=lock_poll_interval,
+            lock_wait_report_interval=lock_wait_report_interval,
+            analyze_after_apply=analyze_after_apply,
+            analyze_parallelism=analyze_parallelism,
+            default_session_settings=default_session_settings,
+            index_build_parallelism=index_build_parallelism,
+            index_build_parallelism_per_table=index_build_parallelism_per_table,
+            index_build_attempts=index_build_attempts,
+            repeatable_parallelism=repeatable_parallelism,
+            pg_dump_path=pg_dump_path,
+            maintenance_database=maintenance_database,
         )
 
     @asynccontextmanager
@@ -73,8 +282,33 @@ class FluxPostgresBackend(MigrationBackend):
         async with Database(self.database_url) as db:
             async with db.connection() as conn:
                 self._conn = conn
+                self._backend_pid = None
                 yield
 
+    @asynccontextmanager
+    async def workers(self, count: int):
+        """
+        Open up to ``count`` (and at most ``repeatable_parallelism``) other
+        backends with their own connections to the database
+        """
+        async with AsyncExitStack() as stack:
+            workers: list[FluxPostgresBackend] = []
+            for _ in range(min(count, self.repeatable_parallelism)):
+                worker = replace(self)
+                await stack.enter_async_context(worker.connection())
+                workers.append(worker)
+            yield workers
+
+    @asynccontextmanager
+    async def _side_connection(self):
+        """
+        Create a separate connection to the database, e.g. to inspect locks
+        while the main connection is busy
+        """
+        async with Database(self.database_url) as db:
+            async with db.connection() as conn:
+                yield conn
+
     @asynccontextmanager
     async def transaction(self):
         """
@@ -89,6 +323,43 @@ class FluxPostgresBackend(MigrationBackend):
         async with self._conn.transaction():
             yield
 
+    async def _set_session_settings(
+        self, conn: Connection, settings: dict[str, str], local: bool
+    ) -> dict[str, str]:
+        """
+        Set the configured ``session_settings``, overridden by the given
+        settings, on a connection and return the settings that were set
+        """
+        settings = {**self.default_session_settings, **settings}
+        for name in settings:
+            if not re.match(VALID_SETTING_NAME, name):
+                raise ValueError(f"Invalid setting name {name!r}")
+
+        for name, value in settings.items():
+            await conn.execute(
+                "select set_config(:name, :value, :is_local)",
+                {"name": name, "value": _setting_value(value), "is_local": local},
+            )
+        return settings
+
+    @asynccontextmanager
+    async def session_settings(self, settings: dict[str, str], local: bool = True):
+        """
+        Apply the configured ``session_settings``, overridden by the given
+        settings, while the context manager is active.
+
+        If ``local``, the settings are applied with ``set local`` semantics and
+        last until the end of the current transaction. Otherwise they're set
+        for the session and reset when the context manager exits.
+        """
+        settings = await self._set_session_settings(self._conn, settings, local)
+        try:
+            yield
+        finally:
+            if not local:
+                for name in settings:
+                    await self._conn.execute(f"reset {name}")
+
     @asynccontextmanager
     async def migration_lock(self):
         """
@@ -99,11 +370,38 @@ class FluxPostgresBackend(MigrationBackend):
         - The context manager exits
         - The transaction ends
         - The connection ends
+
+        The lock is polled for with ``pg_try_advisory_lock``. While waiting,
+        the sessions holding the lock are periodically logged. If
+        ``migrations_lock_timeout`` is set and the lock isn't acquired in time,
+        ``MigrationLockTimeoutError`` is raised.
         """
-        await self._conn.execute(
-            "select pg_advisory_lock(:lock_id)",
+        started_at = time.monotonic()
+        last_reported_at = started_at
+        while not await self._conn.fetch_val(
+            "select pg_try_advisory_lock(:lock_id)",
             {"lock_id": self.migrations_lock_id},
-        )
+        ):
+            now = time.monotonic()
+            if (
+                self.migrations_lock_timeout is not None
+                and now - started_at >= self.migrations_lock_timeout
+            ):
+                blockers = await self.migration_lock_holders()
+                raise MigrationLockTimeoutError(
+                    "Timed out waiting for the migration lock. Held by: "
+                    + (_describe_lock_blockers(blockers) or "unknown"),
+                    blockers=blockers,
+                )
+            if now - last_reported_at >= self.lock_wait_report_interval:
+                last_reported_at = now
+                logger.warning(
+                    "Waiting %.1fs for the migration lock. Held by: %s",
+                    now - started_at,
+                    _describe_lock_blockers(await self.migration_lock_holders())
+                    or "unknown",
+                )
+            await asyncio.sleep(self.lock_poll_interval)
         try:
             yield
         finally:
@@ -112,6 +410,72 @@ class FluxPostgresBackend(MigrationBackend):
                 {"lock_id": self.migrations_lock_id},
             )
 
+    async def migration_lock_holders(self) -> list[LockBlocker]:
+        """
+        Get the sessions holding the migration lock
+        """
+        rows = await self._conn.fetch_all(
+            f"""
+            select {_SESSION_INFO_COLUMNS}
+            from pg_locks l
+            join pg_stat_activity a on a.pid = l.pid
+            where l.locktype = 'advisory'
+            and l.granted
+            and l.classid::bigint = :classid
+            and l.objid::bigint = :objid
+            and l.objsubid = 1
+            and l.pid != pg_backend_pid()
+            """,
+            {
+                "classid": (self.migrations_lock_id >> 32) & 0xFFFFFFFF,
+                "objid": self.migrations_lock_id & 0xFFFFFFFF,
+            },
+        )
+        return [_lock_blocker(row) for row in rows]
+
+    async def _report_lock_waits(self, pid: int):
+        """
+        Periodically log the sessions blocking the given backend process,
+        starting after ``lock_wait_report_interval``
+        """
+        await asyncio.sleep(self.lock_wait_report_interval)
+        try:
+            async with self._side_connection() as conn:
+                while True:
+                    rows = await conn.fetch_all(
+                        f"""
+                        select {_SESSION_INFO_COLUMNS}
+                        from pg_stat_activity a
+                        where a.pid = any(pg_blocking_pids(:pid))
+                        """,
+                        {"pid": pid},
+                    )
+                    if rows:
+                        logger.warning(
+                            "Migration statement is waiting for a lock. "
+                            "Blocked by: %s",
+                            _describe_lock_blockers([_lock_blocker(r) for r in rows]),
+                        )
+                    await asyncio.sleep(self.lock_wait_report_interval)
+        except Exception:
+            logger.debug("Failed to inspect lock waits", exc_info=True)
+
+    @asynccontextmanager
+    async def _lock_wait_reporting(self):
+        """
+        Log sessions blocking the main connection while the context manager is
+        active
+        """
+        if self._backend_pid is None:
+            self._backend_pid = await self._conn.fetch_val("select pg_backend_pid()")
+        reporter = asyncio.create_task(self._report_lock_waits(self._backend_pid))
+        try:
+            yield
+        finally:
+            reporter.cancel()
+            with suppress(asyncio.CancelledError):
+                await reporter
+
     async def is_initialized(self) -> bool:
         """
         Check if the backend is initialized
@@ -124,16 +488,17 @@ class FluxPostgresBackend(MigrationBackend):
         if schema_result is None:
             return False
 
-        table_result = await self._conn.fetch_val(
-            "select table_name from information_schema.tables "
-            "where table_schema = :schema_name and table_name = :table_name;",
-            {
-                "schema_name": self.migrations_schema,
-                "table_name": self.migrations_table,
-            },
-        )
-        if table_result is None:
-            return False
+        for table_name in [self.migrations_table, self.repeatable_migrations_table]:
+            table_result = await self._conn.fetch_val(
+                "select table_name from information_schema.tables "
+                "where table_schema = :schema_name and table_name = :table_name;",
+                {
+                    "schema_name": self.migrations_schema,
+                    "table_name": table_name,
+                },
+            )
+            if table_result is None:
+                return False
 
         return True
 
@@ -157,6 +522,18 @@ class FluxPostgresBackend(MigrationBackend):
             )
             """,
         )
+        await self._conn.execute(
+            f"""
+            create table if not exists {self.qualified_repeatable_migrations_table}
+            (
+                kind text not null,
+                id text not null,
+                hash text not null,
+                applied_at timestamp not null default current_timestamp,
+                primary key (kind, id)
+            )
+            """,
+        )
 
     async def register_migration(self, migration: Migration) -> AppliedMigration:
         """
@@ -178,6 +555,24 @@ class FluxPostgresBackend(MigrationBackend):
             raise RuntimeError("Failed to register migration")
         return AppliedMigration(id=row[0], hash=row[1], applied_at=row[2])
 
+    async def register_migrations(self, migrations: list[Migration]):
+        """
+        Register several migrations as applied in a single statement
+        """
+        await self._conn.execute(
+            f"""
+                insert into {self.qualified_migrations_table}
+                (id, hash, applied_at)
+                select id, hash, current_timestamp
+                from unnest(cast(:ids as text[]), cast(:hashes as text[]))
+                    as migrations(id, hash)
+            """,
+            {
+                "ids": [migration.id for migration in migrations],
+                "hashes": [migration.up_hash for migration in migrations],
+            },
+        )
+
     async def unregister_migration(self, migration: Migration):
         """
         Unregister a migration (when down-migrated)
@@ -193,9 +588,9 @@ class FluxPostgresBackend(MigrationBackend):
         up and down migrations so should not register or unregister the
         migration hash.
         """
-        statements = sqlparse.split(content)
-        for statement in statements:
-            await self._conn.execute(statement.strip())
+        async with self._lock_wait_reporting():
+            for statement in split_statements(content):
+                await self._conn.execute(statement)
 
     async def get_applied_migrations(self) -> set[AppliedMigration]:
         """
@@ -209,6 +604,465 @@ class FluxPostgresBackend(MigrationBackend):
             for row in result
         }
 
+    async def get_applied_repeatable_migrations(self, kind: str) -> dict[str, str]:
+        """
+        Get the hashes of repeatable migrations of the given kind as they were
+        last applied, keyed by migration ID
+        """
+        result = await self._conn.fetch_all(
+            f"select id, hash from {self.qualified_repeatable_migrations_table} "
+            "where kind = :kind",
+            {"kind": kind},
+        )
+        return {row[0]: row[1] for row in result}
+
+    async def register_repeatable_migration(self, kind: str, migration: Migration):
+        """
+        Record the hash of a repeatable migration of the given kind when it is
+        applied
+        """
+        await self._conn.execute(
+            f"""
+            insert into {self.qualified_repeatable_migrations_table}
+            (kind, id, hash, applied_at)
+            values (:kind, :migration_id, :up_hash, current_timestamp)
+            on conflict (kind, id) do update
+            set hash = excluded.hash, applied_at = excluded.applied_at
+            """,
+            {"kind": kind, "migration_id": migration.id, "up_hash": migration.up_hash},
+        )
+
+    async def existing_objects(self, objects: list[str]) -> set[str]:
+        """
+        Get which of the given relations and functions currently exist
+        """
+        rows = await self._conn.fetch_all(
+            "select name from unnest(cast(:names as text[])) as name "
+            "where to_regclass(name) is not null or to_regproc(name) is not null",
+            {"names": objects},
+        )
+        return {row[0] for row in rows}
+
+    async def dependent_objects(
+        self, contents: list[str], roots: list[str], objects: list[str]
+    ) -> dict[str, int]:
+        """
+        Get which of the given objects depend on the tables touched by the
+        given migration contents or on the given root objects, with the depth
+        of their dependency.
+
+        Tables created by the contents are not followed, as nothing that
+        existed before them can depend on them. Dependencies of views and
+        materialized views are found through ``pg_rewrite`` and those of
+        functions through ``pg_depend``, so only functions with SQL-standard
+        bodies are tracked.
+        """
+        names: dict[str, None] = {}
+        for content in contents:
+            for table in touched_tables(content, include_created=False):
+                names.setdefault(table)
+        for root in roots:
+            names.setdefault(root)
+
+        rows = await self._conn.fetch_all(
+            _DEPENDENT_OBJECTS_QUERY, {"names": list(names)}
+        )
+        depths = {normalize_identifier(row[0]): row[1] for row in rows}
+        return {
+            obj: depths[normalize_identifier(obj)]
+            for obj in objects
+            if normalize_identifier(obj) in depths
+        }
+
+    async def dump_schema(self, include_data: bool = False) -> str:
+        """
+        Dump the schema of the database with ``pg_dump``, without ownership,
+        privileges or flux's own tables. Data is dumped as ``insert``
+        statements if ``include_data``.
+
+        Statements that configure the restoring session are removed, as
+        migrations share a session, but the dump declares that it's applied
+        with ``check_function_bodies`` off, as functions are dumped before the
+        tables they use.
+        """
+        process = await asyncio.create_subprocess_exec(
+            self.pg_dump_path,
+            "--column-inserts" if include_data else "--schema-only",
+            "--no-owner",
+            "--no-privileges",
+            f"--exclude-table={self.qualified_migrations_table}",
+            f"--exclude-table={self.qualified_repeatable_migrations_table}",
+            f"--dbname={_libpq_url(self.database_url)}",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise SchemaDumpError(
+                f"pg_dump failed with exit code {process.returncode}: "
+                f"{stderr.decode().strip()}"
+            )
+        schema = _DUMP_SESSION_LINE.sub("", stdout.decode())
+        schema = re.sub(r"\n{3,}", "\n\n", schema).strip()
+        return f"-- flux:set check_function_bodies = off\n\n{schema}\n"
+
+    @property
+    def database_name(self) -> str:
+        return DatabaseURL(self.database_url).database
+
+    @asynccontextmanager
+    async def _maintenance_connection(self):
+        """
+        Create a connection to the maintenance database, to create and drop
+        other databases from
+        """
+        maintenance_url = DatabaseURL(self.database_url).replace(
+            database=self.maintenance_database
+        )
+        async with Database(str(maintenance_url)) as db:
+            async with db.connection() as conn:
+                yield conn
+
+    @asynccontextmanager
+    async def template_lock(self):
+        """
+        Take an advisory lock in the maintenance database, keyed on the
+        template database's name, for as long as the context manager is
+        active
+        """
+        lock_args = {
+            "lock_id": self.migrations_lock_id,
+            "name": self.database_name,
+        }
+        async with self._maintenance_connection() as conn:
+            await conn.execute(
+                "select pg_advisory_lock(:lock_id, hashtext(:name))", lock_args
+            )
+            try:
+                yield
+            finally:
+                await conn.execute(
+                    "select pg_advisory_unlock(:lock_id, hashtext(:name))", lock_args
+                )
+
+    async def template_key(self) -> str | None:
+        """
+        Read the key from the comment on the template database, if it's
+        marked as a template
+        """
+        async with self._maintenance_connection() as conn:
+            row = await conn.fetch_one(
+                "select datistemplate, shobj_description(oid, 'pg_database') "
+                "from pg_database where datname = :name",
+                {"name": self.database_name},
+            )
+        if row is None or not row[0] or row[1] is None:
+            return None
+        if not row[1].startswith(TEMPLATE_COMMENT_PREFIX):
+            return None
+        return row[1][len(TEMPLATE_COMMENT_PREFIX) :]
+
+    async def reset_template(self):
+        """
+        Drop the template database, disconnecting any sessions connected to
+        it, and create it again
+        """
+        name = _quote_identifier(self.database_name)
+        async with self._maintenance_connection() as conn:
+            exists = await conn.fetch_val(
+                "select count(*) from pg_database where datname = :name",
+                {"name": self.database_name},
+            )
+            if exists:
+                await conn.execute(f"alter database {name} is_template false")
+                await conn.execute(f"drop database {name} with (force)")
+            await conn.execute(f"create database {name}")
+
+    async def mark_template(self, key: str):
+        """
+        Mark the template database as a template, so that users with the
+        ``createdb`` privilege can clone it, and record the key in its comment
+        """
+        if not re.match(r"^[0-9A-Za-z_]+$", key):
+            raise ValueError("Invalid template key provided.")
+        name = _quote_identifier(self.database_name)
+        async with self._maintenance_connection() as conn:
+            await conn.execute(f"alter database {name} is_template true")
+            await conn.execute(
+                f"comment on database {name} is '{TEMPLATE_COMMENT_PREFIX}{key}'"
+            )
+
+    async def clone_template(self, name: str | None = None) -> str:
+        """
+        Create a new database with the template database as its template.
+        Postgres copies the template's files directly, which is much faster
+        than migrating, but fails while other sessions are connected to the
+        template. Generated names are the template's name with a random
+        suffix.
+        """
+        if name is None:
+            name = f"{self.database_name}_{uuid.uuid4().hex[:12]}"
+        async with self._maintenance_connection() as conn:
+            await conn.execute(
+                f"create database {_quote_identifier(name)} "
+                f"template {_quote_identifier(self.database_name)}"
+            )
+        return str(DatabaseURL(self.database_url).replace(database=name))
+
+    async def drop_clone(self, connection_uri: str):
+        """
+        Drop a clone of the template database, disconnecting any sessions
+        connected to it
+        """
+        name = _quote_identifier(DatabaseURL(connection_uri).database)
+        async with self._maintenance_connection() as conn:
+            await conn.execute(f"drop database if exists {name} with (force)")
+
+    async def explain_migration(self, content: str) -> list[ExplainedStatement]:
+        """
+        Estimate the cost of each statement in the content of a migration
+        without applying it.
+
+        Explainable DML is passed to ``EXPLAIN`` inside a transaction that is
+        always rolled back. Other statements, such as DDL, are skipped.
+        """
+        explained = []
+        transaction = await self._conn.transaction().start()
+        try:
+            for statement in split_statements(content):
+                if not is_explainable(statement):
+                    explained.append(
+                        ExplainedStatement(
+                            statement=statement,
+                            skipped_reason="Not explainable",
+                        )
+                    )
+                    continue
+                try:
+                    async with self._conn.transaction():
+                        plan = await self._conn.fetch_val(
+                            f"explain (format json) {statement}"
+                        )
+                except Exception as e:
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    explained.append(
+                        ExplainedStatement(
+                            statement=statement,
+                            skipped_reason=f"Could not explain: {error}",
+                        )
+                    )
+                    continue
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                root = plan[0]["Plan"]
+                explained.append(
+                    ExplainedStatement(
+                        statement=statement,
+                        estimated_rows=_estimated_rows(root),
+                        estimated_cost=root["Total Cost"],
+                    )
+                )
+        finally:
+            await transaction.rollback()
+        return explained
+
+    async def estimate_lock_impact(self, content: str) -> list[LockImpact]:
+        """
+        Estimate the impact of the table locks taken by each statement in the
+        content of a migration without applying it.
+
+        Each statement is classified by the lock it takes and whether it
+        rewrites or scans the table, and joined with the table's catalog
+        statistics. Statements that don't lock an existing table are omitted.
+        """
+        impacts = []
+        table_stats: dict[str, tuple[float | None, int | None, int | None]] = {}
+        for statement in split_statements(content):
+            statement_lock = classify_statement_lock(statement)
+            if statement_lock is None:
+                continue
+
+            if statement_lock.table not in table_stats:
+                row = await self._conn.fetch_one(
+                    "select c.reltuples, c.relpages, pg_total_relation_size(c.oid) "
+                    "from pg_class c where c.oid = to_regclass(:table_name)",
+                    {"table_name": statement_lock.table},
+                )
+                if row is None:
+                    table_stats[statement_lock.table] = (None, None, None)
+                else:
+                    reltuples, relpages, total_size = row[0], row[1], row[2]
+                    table_stats[statement_lock.table] = (
+                        # Tables that have never been analyzed have -1 tuples
+                        reltuples if reltuples >= 0 else None,
+                        relpages,
+                        total_size,
+                    )
+            estimated_rows, estimated_pages, total_size = table_stats[
+                statement_lock.table
+            ]
+
+            if not (statement_lock.rewrites or statement_lock.scans):
+                estimated_bytes = 0
+            else:
+                estimated_bytes = total_size
+
+            impacts.append(
+                LockImpact(
+                    statement=statement,
+                    table=statement_lock.table,
+                    lock_mode=statement_lock.lock_mode,
+                    blocks_writes=statement_lock.blocks_writes,
+                    rewrites=statement_lock.rewrites,
+                    scans=statement_lock.scans,
+                    estimated_rows=estimated_rows,
+                    estimated_pages=estimated_pages,
+                    estimated_bytes=estimated_bytes,
+                )
+            )
+        return impacts
+
+    async def build_indexes(
+        self, indexes: list[str], settings: dict[str, str] | None = None
+    ):
+        """
+        Build indexes with ``create index concurrently``, each on its own
+        connection.
+
+        At most ``index_build_parallelism`` indexes are built at once, and at
+        most ``index_build_parallelism_per_table`` on any one table. After each
+        build, ``pg_index.indisvalid`` is checked. Invalid indexes, including
+        ones left behind by earlier failed builds, are dropped and rebuilt up
+        to ``index_build_attempts`` times in total. Valid indexes that already
+        exist are not rebuilt.
+        """
+        definitions = []
+        for index in indexes:
+            definition = parse_index_definition(index)
+            if definition is None:
+                raise ValueError(
+                    f"Not a named 'create index' statement: {index.strip()!r}"
+                )
+            definitions.append(definition)
+
+        pool = asyncio.Semaphore(self.index_build_parallelism)
+        table_pools: dict[str, asyncio.Semaphore] = {}
+        for _, table, _ in definitions:
+            table_pools.setdefault(
+                normalize_identifier(table),
+                asyncio.Semaphore(self.index_build_parallelism_per_table),
+            )
+
+        async def build(index: str, table: str, statement: str):
+            async with table_pools[normalize_identifier(table)], pool:
+                async with self._side_connection() as conn:
+                    await self._set_session_settings(conn, settings or {}, False)
+                    await self._build_index(conn, index, statement)
+
+        results = await asyncio.gather(
+            *(build(*definition) for definition in definitions),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _index_validity(self, conn: Connection, index: str) -> bool | None:
+        """
+        Get whether an index is valid, or None if it doesn't exist
+        """
+        return await conn.fetch_val(
+            "select i.indisvalid from pg_index i "
+            "where i.indexrelid = to_regclass(:index)",
+            {"index": index},
+        )
+
+    async def _build_index(self, conn: Connection, index: str, statement: str):
+        """
+        Build an index concurrently, dropping and rebuilding it while it's
+        invalid
+        """
+        for attempt in range(1, self.index_build_attempts + 1):
+            valid = await self._index_validity(conn, index)
+            if valid:
+                logger.info("Index %s is valid", index)
+                return
+            if valid is not None:
+                logger.warning("Dropping invalid index %s", index)
+                await conn.execute(f"drop index concurrently if exists {index}")
+
+            try:
+                await conn.execute(statement)
+            except Exception:
+                if attempt == self.index_build_attempts:
+                    await conn.execute(f"drop index concurrently if exists {index}")
+                    raise
+                logger.warning(
+                    "Failed to build index %s (attempt %d of %d)",
+                    index,
+                    attempt,
+                    self.index_build_attempts,
+                    exc_info=True,
+                )
+
+        if not await self._index_validity(conn, index):
+            await conn.execute(f"drop index concurrently if exists {index}")
+            raise InvalidIndexError(
+                f"Index {index} is still invalid after "
+                f"{self.index_build_attempts} attempts"
+            )
+
+    async def analyze_migrated_tables(self, migrations: list[Migration]) -> list[str]:
+        """
+        Run ``analyze`` on the tables touched by migrations that have just been
+        applied, if ``analyze_after_apply`` is enabled.
+
+        Touched tables are found by parsing the migrations' statements. Tables
+        that no longer exist, and relations that can't be analyzed such as
+        views, are skipped. With ``analyze_parallelism`` above 1, tables are
+        analyzed concurrently on separate connections.
+        """
+        if not self.analyze_after_apply:
+            return []
+
+        table_names: dict[str, None] = {}
+        for migration in migrations:
+            for table_name in touched_tables(migration.up):
+                table_names.setdefault(table_name)
+
+        tables: list[str] = []
+        for table_name in table_names:
+            table = await self._conn.fetch_val(
+                "select c.oid::regclass::text from pg_class c "
+                "where c.oid = to_regclass(:table_name) "
+                "and c.relkind in ('r', 'm', 'p')",
+                {"table_name": table_name},
+            )
+            if table is not None and table not in tables:
+                tables.append(table)
+
+        if self.analyze_parallelism <= 1 or len(tables) <= 1:
+            for table in tables:
+                await self._conn.execute(f"analyze {table}")
+        else:
+            to_analyze = list(tables)
+
+            async def analyze_worker():
+                async with self._side_connection() as conn:
+                    while to_analyze:
+                        await conn.execute(f"analyze {to_analyze.pop(0)}")
+
+            await asyncio.gather(
+                *(
+                    analyze_worker()
+                    for _ in range(min(self.analyze_parallelism, len(tables)))
+                )
+            )
+
+        if tables:
+            logger.info("Analyzed migrated tables: %s", ", ".join(tables))
+        return tables
+
     # -- Testing methods
 
     async def table_info(self, table_name: str):
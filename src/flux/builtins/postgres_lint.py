@@ -0,0 +1,246 @@
+"""
+Static linting of Postgres migrations for statements that take dangerous locks
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from flux.builtins.postgres_statements import (
+    classify_alter_table_action,
+    normalize_identifier,
+    normalize_statement,
+    parse_alter_table,
+    parse_created_index,
+    parse_created_table,
+    split_statements,
+)
+from flux.migration.migration import Migration
+
+CREATE_INDEX_NOT_CONCURRENTLY = "create-index-not-concurrently"
+SET_NOT_NULL_WITHOUT_CHECK = "set-not-null-without-check"
+FOREIGN_KEY_WITHOUT_NOT_VALID = "foreign-key-without-not-valid"
+TABLE_REWRITE = "table-rewrite"
+
+#: Lint rules and the problems they detect
+LINT_RULES = {
+    CREATE_INDEX_NOT_CONCURRENTLY: (
+        "Creating an index without 'concurrently' blocks writes to the table "
+        "while the index is built"
+    ),
+    SET_NOT_NULL_WITHOUT_CHECK: (
+        "Setting a column not null without a prior validated "
+        "'check (column is not null)' constraint scans the table under an "
+        "access exclusive lock"
+    ),
+    FOREIGN_KEY_WITHOUT_NOT_VALID: (
+        "Adding a foreign key without 'not valid' scans the table while "
+        "blocking writes to it"
+    ),
+    TABLE_REWRITE: "This rewrites the table under an access exclusive lock",
+}
+
+#: Below this many migrations, linting runs in a single process
+PARALLEL_THRESHOLD = 200
+
+_LINT_IGNORE = re.compile(r"flux:lint-ignore\s+([\w\-, ]+)")
+_MIGHT_VIOLATE = re.compile(r"\b(alter|index)\b", re.IGNORECASE)
+_MIGHT_ADD_CHECK = re.compile(r"\bcheck\b", re.IGNORECASE)
+
+_ADD_NOT_NULL_CHECK = re.compile(
+    r"^add\s+(?:constraint\s+(\S+)\s+)?check\s*\(\s*\(?\s*(\S+?)\s+is\s+not\s+null"
+    r"\s*\)?\s*\)(\s+not\s+valid)?$"
+)
+_VALIDATE_CONSTRAINT = re.compile(r"^validate\s+constraint\s+(\S+)$")
+_SET_NOT_NULL = re.compile(r"^alter\s+(?:column\s+)?(\S+)\s+set\s+not\s+null$")
+_ADD_FOREIGN_KEY = re.compile(r"^add\s+(?:constraint\s+\S+\s+)?foreign\s+key\b")
+
+
+@dataclass(eq=True, frozen=True)
+class LintViolation:
+    """
+    A statement in a migration that breaks a lint rule
+    """
+
+    #: The ID of the migration containing the statement
+    migration_id: str
+
+    #: The index of the statement within the migration
+    statement_index: int
+
+    #: The statement text
+    statement: str
+
+    #: The name of the broken rule
+    rule: str
+
+    #: A description of the problem
+    message: str
+
+
+def _violation(
+    migration: Migration, statement_index: int, statement: str, rule: str
+) -> LintViolation:
+    return LintViolation(
+        migration_id=migration.id,
+        statement_index=statement_index,
+        statement=statement,
+        rule=rule,
+        message=LINT_RULES[rule],
+    )
+
+
+def _lint_migration(
+    item: tuple[Migration, bool]
+) -> tuple[list[LintViolation], list[tuple]]:
+    """
+    Lint a single migration.
+
+    Returns violations that can be decided from the migration alone, and the
+    ordered not-null check events that need the history of earlier migrations
+    to be decided. Only events are collected for migrations that are not
+    reported.
+    """
+    migration, reported = item
+    prefilter = _MIGHT_VIOLATE if reported else _MIGHT_ADD_CHECK
+    if not prefilter.search(migration.up):
+        return [], []
+
+    ignored = {
+        rule.strip()
+        for match in _LINT_IGNORE.finditer(migration.up)
+        for rule in match.group(1).split(",")
+    }
+
+    violations: list[LintViolation] = []
+    events: list[tuple] = []
+    created_tables: set[str] = set()
+
+    for index, statement in enumerate(split_statements(migration.up)):
+        normalized = normalize_statement(statement)
+
+        if created_table := parse_created_table(normalized):
+            created_tables.add(normalize_identifier(created_table))
+            continue
+
+        if created_index := parse_created_index(normalized):
+            table, concurrently = created_index
+            if not concurrently and normalize_identifier(table) not in created_tables:
+                violations.append(
+                    _violation(
+                        migration, index, statement, CREATE_INDEX_NOT_CONCURRENTLY
+                    )
+                )
+            continue
+
+        alter_table = parse_alter_table(normalized)
+        if alter_table is None:
+            continue
+        table = normalize_identifier(alter_table[0])
+        if table in created_tables:
+            continue
+
+        for action in (action.lower() for action in alter_table[1]):
+            if match := _ADD_NOT_NULL_CHECK.match(action):
+                constraint, column, not_valid = match.groups()
+                events.append(
+                    (
+                        "check",
+                        table,
+                        constraint and normalize_identifier(constraint),
+                        normalize_identifier(column),
+                        not not_valid,
+                    )
+                )
+            elif match := _VALIDATE_CONSTRAINT.match(action):
+                events.append(("validate", table, normalize_identifier(match[1])))
+            elif match := _SET_NOT_NULL.match(action):
+                events.append(
+                    (
+                        "set_not_null",
+                        table,
+                        normalize_identifier(match[1]),
+                        index,
+                        statement,
+                    )
+                )
+            elif _ADD_FOREIGN_KEY.match(action) and "not valid" not in action:
+                violations.append(
+                    _violation(
+                        migration, index, statement, FOREIGN_KEY_WITHOUT_NOT_VALID
+                    )
+                )
+            elif classify_alter_table_action(action)[1]:
+                violations.append(
+                    _violation(migration, index, statement, TABLE_REWRITE)
+                )
+
+    violations = [v for v in violations if v.rule not in ignored]
+    if SET_NOT_NULL_WITHOUT_CHECK in ignored:
+        events = [e for e in events if e[0] != "set_not_null"]
+    return violations, events
+
+
+def lint_migrations(
+    migrations: list[Migration],
+    since: str | None = None,
+    jobs: int | None = None,
+) -> list[LintViolation]:
+    """
+    Lint migrations for statements that take dangerous locks.
+
+    Migrations are linted in parallel across ``jobs`` processes (defaulting to
+    the number of CPUs) when there are many of them. Only violations in
+    migrations after the ``since`` migration ID are reported, but earlier
+    migrations are still read for constraints that make later statements
+    safe.
+
+    Rules can be ignored for a migration with a comment in its content, such
+    as ``-- flux:lint-ignore create-index-not-concurrently``.
+    """
+    items = [
+        (migration, since is None or migration.id > since) for migration in migrations
+    ]
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(items) < PARALLEL_THRESHOLD:
+        results = list(map(_lint_migration, items))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(
+                executor.map(
+                    _lint_migration,
+                    items,
+                    chunksize=max(1, len(items) // (workers * 4)),
+                )
+            )
+
+    violations: list[LintViolation] = []
+    unvalidated_checks: dict[tuple[str, str], str] = {}
+    validated_columns: set[tuple[str, str]] = set()
+    for (migration, reported), (migration_violations, events) in zip(items, results):
+        if reported:
+            violations.extend(migration_violations)
+        for event in events:
+            if event[0] == "check":
+                _, table, constraint, column, validated = event
+                if validated:
+                    validated_columns.add((table, column))
+                elif constraint is not None:
+                    unvalidated_checks[(table, constraint)] = column
+            elif event[0] == "validate":
+                _, table, constraint = event
+                if (table, constraint) in unvalidated_checks:
+                    column = unvalidated_checks.pop((table, constraint))
+                    validated_columns.add((table, column))
+            elif event[0] == "set_not_null":
+                _, table, column, index, statement = event
+                if reported and (table, column) not in validated_columns:
+                    violations.append(
+                        _violation(
+                            migration, index, statement, SET_NOT_NULL_WITHOUT_CHECK
+                        )
+                    )
+
+    return sorted(violations, key=lambda v: (v.migration_id, v.statement_index))
@@ -0,0 +1,447 @@
+"""
+Helpers for working with the individual statements of Postgres migrations
+"""
+
+import re
+from dataclasses import dataclass
+
+try:
+    import sqlparse
+except ImportError as e:
+    raise ImportError(
+        "Please install the postgres dependency group of flux-migrations to use the builtin Postgres backend. For example: pip install 'flux-migrations[postgres]'"  # noqa: E501
+    ) from e
+
+#: Statement types that Postgres can ``EXPLAIN`` without executing them
+EXPLAINABLE_STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "MERGE"}
+
+ACCESS_SHARE = "ACCESS SHARE"
+ROW_SHARE = "ROW SHARE"
+ROW_EXCLUSIVE = "ROW EXCLUSIVE"
+SHARE_UPDATE_EXCLUSIVE = "SHARE UPDATE EXCLUSIVE"
+SHARE = "SHARE"
+SHARE_ROW_EXCLUSIVE = "SHARE ROW EXCLUSIVE"
+EXCLUSIVE = "EXCLUSIVE"
+ACCESS_EXCLUSIVE = "ACCESS EXCLUSIVE"
+
+#: Table lock modes, from weakest to strongest
+LOCK_MODES = [
+    ACCESS_SHARE,
+    ROW_SHARE,
+    ROW_EXCLUSIVE,
+    SHARE_UPDATE_EXCLUSIVE,
+    SHARE,
+    SHARE_ROW_EXCLUSIVE,
+    EXCLUSIVE,
+    ACCESS_EXCLUSIVE,
+]
+
+#: Lock modes that block writes to the table while they are held
+WRITE_BLOCKING_LOCK_MODES = {SHARE, SHARE_ROW_EXCLUSIVE, EXCLUSIVE, ACCESS_EXCLUSIVE}
+
+#: Quoted strings, quoted identifiers and comments
+_LEXICAL_TOKEN_PATTERN = (
+    r"(?<![\w$])[eE]'(?:\\.|[^'\\]|'')*'"
+    r"|'(?:[^']|'')*'"
+    r'|"(?:[^"]|"")*"'
+    r"|\$(\w*)\$.*?\$\1\$"
+    r"|--[^\n]*"
+    r"|/\*.*?\*/"
+)
+_LEXICAL_TOKEN = re.compile(_LEXICAL_TOKEN_PATTERN, re.DOTALL)
+_STATEMENT_TOKEN = re.compile(rf"{_LEXICAL_TOKEN_PATTERN}|[();]", re.DOTALL)
+_BEGIN_ATOMIC = re.compile(r"\bbegin\s+atomic\b", re.IGNORECASE)
+
+_NAME = r'(?:"[^"]+"|[\w$]+)'
+_QUALIFIED_NAME = rf"({_NAME}(?:\.{_NAME})?)"
+
+_VOLATILE_DEFAULT = re.compile(
+    r"\bdefault\b.*\b(random|gen_random_uuid|uuid_generate_v[14]|clock_timestamp"
+    r"|timeofday|nextval|txid_current)\s*\(",
+    re.IGNORECASE,
+)
+_SERIAL_TYPE = re.compile(r"\b(small|big)?serial\b", re.IGNORECASE)
+_GENERATED_COLUMN = re.compile(
+    r"\bgenerated\s+(always|by\s+default)\s+as\s+(identity|\(.*\)\s*stored)",
+    re.IGNORECASE,
+)
+
+_ALTER_TABLE = re.compile(
+    rf"^alter\s+table\s+(?:if\s+exists\s+)?(?:only\s+)?{_QUALIFIED_NAME}\s+(.*)$",
+    re.IGNORECASE,
+)
+_CREATE_TABLE = re.compile(
+    r"^create\s+(?:(?:global|local)\s+)?(?:(?:temporary|temp|unlogged)\s+)?table\s+"
+    rf"(?:if\s+not\s+exists\s+)?{_QUALIFIED_NAME}",
+    re.IGNORECASE,
+)
+_CREATE_INDEX = re.compile(
+    r"^create\s+(?:unique\s+)?index\s+(concurrently\s+)?(?:if\s+not\s+exists\s+)?"
+    rf"(?:({_NAME})\s+)?on\s+(?:only\s+)?{_QUALIFIED_NAME}",
+    re.IGNORECASE,
+)
+_INDEX_KEYWORD = re.compile(r"^(create\s+(?:unique\s+)?index)\s+", re.IGNORECASE)
+_REINDEX_TABLE = re.compile(
+    rf"^reindex\s+(?:\(.*?\)\s*)?table\s+(concurrently\s+)?{_QUALIFIED_NAME}",
+    re.IGNORECASE,
+)
+_REFRESH_MATERIALIZED_VIEW = re.compile(
+    r"^refresh\s+materialized\s+view\s+(concurrently\s+)?" rf"{_QUALIFIED_NAME}",
+    re.IGNORECASE,
+)
+_VACUUM_FULL = re.compile(
+    rf"^vacuum\s+(?:\(\s*full[^)]*\)|full)\s+(?:\w+\s+)*?{_QUALIFIED_NAME}\s*;?$",
+    re.IGNORECASE,
+)
+_CLUSTER = re.compile(rf"^cluster\s+(?:verbose\s+)?{_QUALIFIED_NAME}", re.IGNORECASE)
+_TRUNCATE = re.compile(
+    rf"^truncate\s+(?:table\s+)?(?:only\s+)?{_QUALIFIED_NAME}", re.IGNORECASE
+)
+_DROP_TABLE = re.compile(
+    rf"^drop\s+table\s+(?:if\s+exists\s+)?{_QUALIFIED_NAME}", re.IGNORECASE
+)
+_LOCK_TABLE = re.compile(
+    rf"^lock\s+(?:table\s+)?(?:only\s+)?{_QUALIFIED_NAME}" r"(?:\s+in\s+(.+?)\s+mode)?",
+    re.IGNORECASE,
+)
+_UPDATE = re.compile(rf"^update\s+(?:only\s+)?{_QUALIFIED_NAME}", re.IGNORECASE)
+_DELETE = re.compile(rf"^delete\s+from\s+(?:only\s+)?{_QUALIFIED_NAME}", re.IGNORECASE)
+_INSERT = re.compile(rf"^insert\s+into\s+{_QUALIFIED_NAME}", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class StatementLock:
+    """
+    The table lock taken by a statement and the work done while holding it
+    """
+
+    #: The name of the locked table, as written in the statement
+    table: str
+
+    #: The strongest lock mode taken on the table
+    lock_mode: str
+
+    #: Whether the statement rewrites the whole table
+    rewrites: bool = False
+
+    #: Whether the statement scans the whole table
+    scans: bool = False
+
+    @property
+    def blocks_writes(self) -> bool:
+        return self.lock_mode in WRITE_BLOCKING_LOCK_MODES
+
+
+def split_statements(content: str) -> list[str]:
+    """
+    Split the content of a migration into its individual statements.
+
+    Semicolons inside quotes, comments and parentheses don't end a statement.
+    Content with SQL-standard ``begin atomic`` function bodies is split by
+    ``sqlparse`` instead, which is slower but understands them.
+    """
+    if _BEGIN_ATOMIC.search(content):
+        statements = [s for s in sqlparse.split(content) if strip_comments(s)]
+    else:
+        statements = []
+        depth = 0
+        start = 0
+        for match in _STATEMENT_TOKEN.finditer(content):
+            token = match.group(0)
+            if token == "(":
+                depth += 1
+            elif token == ")":
+                depth = max(depth - 1, 0)
+            elif token == ";" and depth == 0:
+                statements.append(content[start : match.end()])
+                start = match.end()
+        # Trailing comments aren't a statement
+        if strip_comments(content[start:]):
+            statements.append(content[start:])
+    return [statement.strip() for statement in statements if statement.strip()]
+
+
+def statement_type(statement: str) -> str:
+    """
+    Get the type of a statement, e.g. "SELECT", "CREATE" or "ALTER".
+
+    Returns "UNKNOWN" if the type can't be determined.
+    """
+    parsed = sqlparse.parse(statement)
+    if not parsed:
+        return "UNKNOWN"
+    return parsed[0].get_type()
+
+
+def is_explainable(statement: str) -> bool:
+    """
+    Whether a statement is DML that can be safely passed to ``EXPLAIN``
+    """
+    return statement_type(statement) in EXPLAINABLE_STATEMENT_TYPES
+
+
+def strip_comments(statement: str) -> str:
+    """
+    Strip comments and surrounding whitespace from a statement
+    """
+    return _LEXICAL_TOKEN.sub(
+        lambda m: " " if m.group(0)[:2] in ("--", "/*") else m.group(0), statement
+    ).strip()
+
+
+def normalize_statement(statement: str) -> str:
+    """
+    Strip comments from a statement and collapse its whitespace
+    """
+    return " ".join(strip_comments(statement).split())
+
+
+def split_top_level(text: str, separator: str = ",") -> list[str]:
+    """
+    Split text on a separator, ignoring separators inside parentheses or
+    quotes
+    """
+    parts = []
+    depth = 0
+    quote: str | None = None
+    current = ""
+    for char in text:
+        if quote is not None:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(current.strip())
+            current = ""
+            continue
+        current += char
+    if current.strip():
+        parts.append(current.strip())
+    return parts
+
+
+def strongest_lock_mode(lock_modes: list[str]) -> str:
+    """
+    Get the strongest of a list of lock modes
+    """
+    return max(lock_modes, key=LOCK_MODES.index)
+
+
+def classify_alter_table_action(action: str) -> tuple[str, bool, bool]:
+    """
+    Classify a single action of an ``alter table`` statement, returning its
+    lock mode and whether it rewrites or scans the table
+    """
+    action = action.rstrip(";").strip().lower()
+    is_constraint = re.match(
+        r"^add\s+(constraint\s+\S+\s+)?(check|foreign\s+key|primary\s+key|unique"
+        r"|exclude)\b",
+        action,
+    )
+    if is_constraint:
+        kind = is_constraint.group(2)
+        if kind == "check":
+            return ACCESS_EXCLUSIVE, False, "not valid" not in action
+        if kind.startswith("foreign"):
+            return SHARE_ROW_EXCLUSIVE, False, "not valid" not in action
+        return ACCESS_EXCLUSIVE, False, "using index" not in action
+    if re.match(r"^add\b", action):
+        rewrites = bool(
+            _VOLATILE_DEFAULT.search(action)
+            or _SERIAL_TYPE.search(action)
+            or _GENERATED_COLUMN.search(action)
+        )
+        return ACCESS_EXCLUSIVE, rewrites, False
+    if re.match(r"^alter\s+(column\s+)?\S+\s+(set\s+data\s+)?type\b", action):
+        return ACCESS_EXCLUSIVE, True, False
+    if re.match(r"^alter\s+(column\s+)?\S+\s+set\s+not\s+null\b", action):
+        return ACCESS_EXCLUSIVE, False, True
+    if re.match(r"^alter\s+(column\s+)?\S+\s+set\s+(statistics|storage)\b", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, False
+    if re.match(r"^validate\s+constraint\b", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, True
+    if re.match(r"^set\s+(tablespace|logged|unlogged)\b", action):
+        return ACCESS_EXCLUSIVE, True, False
+    if re.match(r"^(set|reset)\s*\(", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, False
+    if re.match(r"^(enable|disable)\s+trigger\b", action):
+        return SHARE_ROW_EXCLUSIVE, False, False
+    if re.match(r"^(cluster\s+on|set\s+without\s+cluster)\b", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, False
+    if re.match(r"^attach\s+partition\b", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, True
+    if re.match(r"^detach\s+partition\b.*\bconcurrently\b", action):
+        return SHARE_UPDATE_EXCLUSIVE, False, False
+    return ACCESS_EXCLUSIVE, False, False
+
+
+def normalize_identifier(name: str) -> str:
+    """
+    Normalize a possibly schema-qualified and quoted name for comparison.
+
+    Unquoted identifiers are lowercased and the ``public`` schema is dropped.
+    """
+    parts = []
+    for part in re.findall(_NAME, name):
+        if part.startswith('"'):
+            parts.append(part[1:-1])
+        else:
+            parts.append(part.lower())
+    if len(parts) == 2 and parts[0] == "public":
+        parts = parts[1:]
+    return ".".join(parts)
+
+
+def parse_alter_table(normalized: str) -> tuple[str, list[str]] | None:
+    """
+    Parse a normalized ``alter table`` statement into the altered table and its
+    individual actions.
+
+    Returns None if the statement is not an ``alter table`` statement.
+    """
+    match = _ALTER_TABLE.match(normalized)
+    if match is None:
+        return None
+    table, actions = match.groups()
+    return table, [action.rstrip(";").strip() for action in split_top_level(actions)]
+
+
+def parse_created_table(normalized: str) -> str | None:
+    """
+    Get the table created by a normalized ``create table`` statement, or None
+    if the statement does not create a table
+    """
+    match = _CREATE_TABLE.match(normalized)
+    return match.group(1) if match else None
+
+
+def parse_created_index(normalized: str) -> tuple[str, bool] | None:
+    """
+    Get the table indexed by a normalized ``create index`` statement, and
+    whether the index is built concurrently.
+
+    Returns None if the statement does not create an index.
+    """
+    match = _CREATE_INDEX.match(normalized)
+    if match is None:
+        return None
+    concurrently, _, table = match.groups()
+    return table, bool(concurrently)
+
+
+def parse_index_definition(statement: str) -> tuple[str, str, str] | None:
+    """
+    Parse a named ``create index`` statement into the qualified name of the
+    index, the indexed table, and an equivalent statement that builds the index
+    concurrently.
+
+    Returns None if the statement does not create a named index.
+    """
+    match = _CREATE_INDEX.match(normalize_statement(statement))
+    if match is None or match.group(2) is None:
+        return None
+    concurrently, index, table = match.groups()
+
+    table_parts = re.findall(_NAME, table)
+    if len(table_parts) == 2:
+        index = f"{table_parts[0]}.{index}"
+
+    statement = strip_comments(statement).rstrip(";").rstrip()
+    if not concurrently:
+        statement = _INDEX_KEYWORD.sub(r"\1 concurrently ", statement, count=1)
+    return index, table, statement
+
+
+def classify_statement_lock(statement: str) -> StatementLock | None:
+    """
+    Classify the lock a statement takes on an existing table, and whether it
+    rewrites or scans that table while holding it.
+
+    Returns None for statements that don't lock an existing table, such as
+    ``create table``. The classification is conservative, e.g. all column type
+    changes are assumed to rewrite the table.
+    """
+    normalized = normalize_statement(statement)
+
+    if alter_table := parse_alter_table(normalized):
+        table, actions = alter_table
+        classified = [classify_alter_table_action(action) for action in actions]
+        return StatementLock(
+            table=table,
+            lock_mode=strongest_lock_mode([c[0] for c in classified]),
+            rewrites=any(c[1] for c in classified),
+            scans=any(c[2] for c in classified),
+        )
+    if created_index := parse_created_index(normalized):
+        table, concurrently = created_index
+        return StatementLock(
+            table=table,
+            lock_mode=SHARE_UPDATE_EXCLUSIVE if concurrently else SHARE,
+            scans=True,
+        )
+    if match := _REINDEX_TABLE.match(normalized):
+        concurrently, table = match.groups()
+        return StatementLock(
+            table=table,
+            lock_mode=SHARE_UPDATE_EXCLUSIVE if concurrently else SHARE,
+            scans=True,
+        )
+    if match := _REFRESH_MATERIALIZED_VIEW.match(normalized):
+        concurrently, table = match.groups()
+        if concurrently:
+            return StatementLock(table=table, lock_mode=EXCLUSIVE, scans=True)
+        return StatementLock(table=table, lock_mode=ACCESS_EXCLUSIVE, rewrites=True)
+    if match := _VACUUM_FULL.match(normalized) or _CLUSTER.match(normalized):
+        return StatementLock(
+            table=match.group(1), lock_mode=ACCESS_EXCLUSIVE, rewrites=True
+        )
+    if match := _TRUNCATE.match(normalized) or _DROP_TABLE.match(normalized):
+        return StatementLock(table=match.group(1), lock_mode=ACCESS_EXCLUSIVE)
+    if match := _LOCK_TABLE.match(normalized):
+        table, lock_mode = match.groups()
+        return StatementLock(
+            table=table,
+            lock_mode=lock_mode.upper() if lock_mode else ACCESS_EXCLUSIVE,
+        )
+    if match := _UPDATE.match(normalized) or _DELETE.match(normalized):
+        return StatementLock(table=match.group(1), lock_mode=ROW_EXCLUSIVE, scans=True)
+    if match := _INSERT.match(normalized):
+        return StatementLock(table=match.group(1), lock_mode=ROW_EXCLUSIVE)
+    return None
+
+
+def touched_tables(content: str, include_created: bool = True) -> list[str]:
+    """
+    Get the tables whose contents or structure may be changed by the
+    statements in a migration, as written in the statements, in the order
+    they are first touched.
+
+    Tables that are dropped by a later statement are not included, nor are
+    tables created by the migration unless ``include_created``.
+    """
+    tables: dict[str, str] = {}
+    created: set[str] = set()
+    for statement in split_statements(content):
+        normalized = normalize_statement(statement)
+        if match := _DROP_TABLE.match(normalized):
+            tables.pop(normalize_identifier(match.group(1)), None)
+            continue
+        if _LOCK_TABLE.match(normalized):
+            continue
+        table = parse_created_table(normalized)
+        if table is not None:
+            created.add(normalize_identifier(table))
+        elif statement_lock := classify_statement_lock(statement):
+            table = statement_lock.table
+        if table is not None:
+            tables.setdefault(normalize_identifier(table), table)
+    return [
+        table
+        for name, table in tables.items()
+        if include_created or name not in created
+    ]
@@ -1,25 +1,41 @@
 import asyncio
+import dataclasses
 import datetime as dt
+import json
+import logging
 import os
+from contextlib import contextmanager
 from dataclasses import dataclass
 from typing import Optional
 
 import typer
 from rich import print
 from rich.console import Console
+from rich.logging import RichHandler
 from rich.prompt import Confirm, Prompt
 from rich.table import Table
 from typing_extensions import Annotated
 
+from flux.backend.explained_statement import ExplainedStatement
 from flux.backend.get_backends import get_backend
+from flux.backend.lock_blocker import LockBlocker
+from flux.backend.lock_impact import LockImpact
 from flux.config import FluxConfig
 from flux.constants import (
+    BASELINE_MIGRATION_SUFFIX,
     FLUX_CONFIG_FILE,
     FLUX_DEFAULT_MIGRATION_DIRECTORY,
+    MIGRATION_PHASES,
     POST_APPLY_DIRECTORY,
     PRE_APPLY_DIRECTORY,
 )
-from flux.exceptions import BackendNotInstalledError
+from flux.exceptions import (
+    BackendNotInstalledError,
+    MigrationLockTimeoutError,
+    MigrationSquashError,
+    SchemaDumpError,
+)
+from flux.migration.read_migration import read_migrations
 from flux.runner import FluxRunner
 
 APPLIED_STATUS = "Applied"
@@ -27,6 +43,8 @@ TO_APPLY_STATUS = "To Apply"
 TO_ROLLBACK_STATUS = "To Undo"
 NOT_APPLIED_STATUS = "Not Applied"
 
+STATEMENT_PREVIEW_LENGTH = 60
+
 
 def async_run(coro):
     # Temp ugly workaround for testing until typer supports async
@@ -46,10 +64,18 @@ class _CliState:
 app = typer.Typer()
 
 
+def _configure_logging(config: FluxConfig):
+    logger = logging.getLogger("flux")
+    logger.setLevel(config.log_level.upper())
+    if not any(isinstance(h, RichHandler) for h in logger.handlers):
+        logger.addHandler(RichHandler(show_path=False))
+
+
 @app.callback()
 def prepare_state(ctx: typer.Context) -> FluxConfig | None:
     if os.path.exists(FLUX_CONFIG_FILE):
         config = FluxConfig.from_file(FLUX_CONFIG_FILE)
+        _configure_logging(config)
     else:
         config = None
 
@@ -213,12 +239,103 @@ def _print_status_report(runner: FluxRunner):
     console.print(table)
 
 
-def _print_apply_report(runner: FluxRunner, n: int | None):
+def _statement_preview(statement: str) -> str:
+    preview = " ".join(statement.split())
+    if len(preview) > STATEMENT_PREVIEW_LENGTH:
+        return preview[: STATEMENT_PREVIEW_LENGTH - 3] + "..."
+    return preview
+
+
+def _print_explain_report(explanations: dict[str, list[ExplainedStatement]]):
+    table = Table(title="Explain")
+    table.add_column("ID")
+    table.add_column("Statement")
+    table.add_column("Est. Rows", justify="right")
+    table.add_column("Est. Cost", justify="right")
+    table.add_column("Note")
+
+    for migration_id, statements in explanations.items():
+        for statement in statements:
+            if statement.explained:
+                table.add_row(
+                    migration_id,
+                    _statement_preview(statement.statement),
+                    f"{statement.estimated_rows:.0f}",
+                    f"{statement.estimated_cost:.2f}",
+                    "",
+                )
+            else:
+                table.add_row(
+                    migration_id,
+                    _statement_preview(statement.statement),
+                    "",
+                    "",
+                    statement.skipped_reason,
+                )
+
+    console = Console()
+    console.print(table)
+
+
+def _format_bytes(n_bytes: int | None) -> str:
+    if n_bytes is None:
+        return "?"
+    size = float(n_bytes)
+    for unit in ["B", "kB", "MB", "GB"]:
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _print_lock_impact_report(
+    lock_impacts: dict[str, list[LockImpact]],
+    over_threshold: dict[str, list[LockImpact]],
+):
+    table = Table(title="Lock Impact")
+    table.add_column("ID")
+    table.add_column("Statement")
+    table.add_column("Table")
+    table.add_column("Lock")
+    table.add_column("Effect")
+    table.add_column("Est. Rows", justify="right")
+    table.add_column("Size", justify="right")
+
+    for migration_id, impacts in lock_impacts.items():
+        for impact in impacts:
+            effect = "Rewrite" if impact.rewrites else "Scan" if impact.scans else ""
+            if impact in over_threshold.get(migration_id, []):
+                effect = f"{effect} (over threshold)"
+            table.add_row(
+                migration_id,
+                _statement_preview(impact.statement),
+                impact.table,
+                impact.lock_mode,
+                effect,
+                (
+                    f"{impact.estimated_rows:.0f}"
+                    if impact.estimated_rows is not None
+                    else "?"
+                ),
+                _format_bytes(impact.estimated_bytes),
+            )
+
+    console = Console()
+    console.print(table)
+
+
+def _print_apply_report(
+    runner: FluxRunner,
+    n: int | None,
+    explanations: dict[str, list[ExplainedStatement]] | None = None,
+    lock_impacts: dict[str, list[LockImpact]] | None = None,
+    phase: str | None = None,
+):
     table = Table(title="Apply Migrations")
     table.add_column("ID")
     table.add_column("Status")
 
-    migrations_to_apply = {m.id for m in runner.migrations_to_apply(n=n)}
+    migrations_to_apply = {m.id for m in runner.migrations_to_apply(n=n, phase=phase)}
 
     for migration in runner.list_applied_migrations():
         table.add_row(migration.id, APPLIED_STATUS)
@@ -234,6 +351,14 @@ def _print_apply_report(runner: FluxRunner, n: int | None):
     console = Console()
     console.print(table)
 
+    if explanations is not None:
+        _print_explain_report(explanations)
+
+    if lock_impacts is not None:
+        _print_lock_impact_report(
+            lock_impacts, runner.lock_impacts_over_threshold(lock_impacts)
+        )
+
 
 def _print_rollback_report(runner: FluxRunner, n: int | None):
     table = Table(title="Rollback Migrations")
@@ -257,12 +382,46 @@ def _print_rollback_report(runner: FluxRunner, n: int | None):
     console.print(table)
 
 
+def _print_lock_holders_report(blockers: list[LockBlocker]):
+    table = Table(title="Lock Holders")
+    table.add_column("PID", justify="right")
+    table.add_column("User")
+    table.add_column("Application")
+    table.add_column("State")
+    table.add_column("Query")
+    table.add_column("Age", justify="right")
+
+    for blocker in blockers:
+        table.add_row(
+            str(blocker.pid),
+            blocker.user or "",
+            blocker.application_name or "",
+            blocker.state or "",
+            _statement_preview(blocker.query or ""),
+            f"{blocker.query_age:.1f}s" if blocker.query_age is not None else "?",
+        )
+
+    console = Console()
+    console.print(table)
+
+
+@contextmanager
+def _reporting_lock_timeout():
+    try:
+        yield
+    except MigrationLockTimeoutError as e:
+        print("Timed out waiting for the migration lock")
+        _print_lock_holders_report(e.blockers)
+        raise typer.Exit(code=1)
+
+
 async def _status(connection_uri: str):
-    async with FluxRunner.from_file(
-        path=FLUX_CONFIG_FILE,
-        connection_uri=connection_uri,
-    ) as runner:
-        _print_status_report(runner=runner)
+    with _reporting_lock_timeout():
+        async with FluxRunner.from_file(
+            path=FLUX_CONFIG_FILE,
+            connection_uri=connection_uri,
+        ) as runner:
+            _print_status_report(runner=runner)
 
 
 @app.command()
@@ -275,20 +434,56 @@ async def _apply(
     connection_uri: str,
     n: int | None,
     auto_approve: bool = False,
+    explain: bool = False,
+    lock_impact: bool = False,
+    allow_lock_impact: bool = False,
+    phase: str | None = None,
+    force_repeatable: bool = False,
 ):
     config: FluxConfig | None = ctx.obj.config
     if config is None:
         print("Please run `flux init` to create a configuration file")
         raise typer.Exit(code=1)
-    async with FluxRunner.from_file(
-        path=FLUX_CONFIG_FILE,
-        connection_uri=connection_uri,
-    ) as runner:
-        _print_apply_report(runner=runner, n=n)
-        if not auto_approve:
-            if not Confirm.ask("Apply these migrations?"):
-                raise typer.Exit(1)
-        await runner.apply_migrations(n=n)
+    if phase is not None and phase not in MIGRATION_PHASES:
+        print(f"Phase must be one of {', '.join(MIGRATION_PHASES)}")
+        raise typer.Exit(code=1)
+    with _reporting_lock_timeout():
+        async with FluxRunner.from_file(
+            path=FLUX_CONFIG_FILE,
+            connection_uri=connection_uri,
+        ) as runner:
+            explanations = None
+            lock_impacts = None
+            try:
+                if explain:
+                    explanations = await runner.explain_migrations(n=n, phase=phase)
+                if lock_impact or config.lock_impact_threshold_bytes is not None:
+                    lock_impacts = await runner.estimate_lock_impact(n=n, phase=phase)
+            except NotImplementedError as e:
+                print(str(e))
+                raise typer.Exit(code=1)
+            _print_apply_report(
+                runner=runner,
+                n=n,
+                explanations=explanations,
+                lock_impacts=lock_impacts,
+                phase=phase,
+            )
+            if lock_impacts is not None and not allow_lock_impact:
+                if runner.lock_impacts_over_threshold(lock_impacts):
+                    print(
+                        "Migrations exceed the lock impact threshold. Use --allow-lock-impact to apply them anyway."  # noqa: E501
+                    )
+                    raise typer.Exit(code=1)
+            if not auto_approve:
+                if not Confirm.ask("Apply these migrations?"):
+                    raise typer.Exit(1)
+            await runner.apply_migrations(
+                n=n,
+                ignore_lock_impact_threshold=True,
+                phase=phase,
+                force_repeatable=force_repeatable,
+            )
 
 
 @app.command()
@@ -304,9 +499,49 @@ def apply(
         ),
     ] = None,
     auto_approve: bool = False,
+    explain: Annotated[
+        bool,
+        typer.Option(
+            help="Estimate the cost of each statement in the migrations to apply"
+        ),
+    ] = False,
+    lock_impact: Annotated[
+        bool,
+        typer.Option(
+            help="Estimate the table locks taken by the migrations to apply (always on if a lock impact threshold is configured)"  # noqa: E501
+        ),
+    ] = False,
+    allow_lock_impact: Annotated[
+        bool,
+        typer.Option(
+            help="Apply migrations even if they exceed the lock impact threshold"
+        ),
+    ] = False,
+    phase: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Only apply migrations in this phase. 'expand' applies pending expand-phase migrations, skipping contract-phase ones and stopping at untagged ones. 'contract' applies everything pending"  # noqa: E501
+        ),
+    ] = None,
+    force_repeatable: Annotated[
+        bool,
+        typer.Option(
+            help="Apply all repeatable migrations, even if they haven't changed and no migrations are pending"  # noqa: E501
+        ),
+    ] = False,
 ):
     async_run(
-        _apply(ctx, connection_uri=connection_uri, n=n, auto_approve=auto_approve)
+        _apply(
+            ctx,
+            connection_uri=connection_uri,
+            n=n,
+            auto_approve=auto_approve,
+            explain=explain,
+            lock_impact=lock_impact,
+            allow_lock_impact=allow_lock_impact,
+            phase=phase,
+            force_repeatable=force_repeatable,
+        )
     )
 
 
@@ -316,21 +551,25 @@ async def _rollback(
     n: int | None,
     auto_approve: bool = False,
     repeatable: bool | None = None,
+    force_repeatable: bool = False,
 ):
     config: FluxConfig | None = ctx.obj.config
     if config is None:
         print("Please run `flux init` to create a configuration file")
         raise typer.Exit(code=1)
-    async with FluxRunner.from_file(
-        path=FLUX_CONFIG_FILE,
-        connection_uri=connection_uri,
-    ) as runner:
-        _print_rollback_report(runner=runner, n=n)
-        if not auto_approve:
-            if not Confirm.ask("Undo these migrations?"):
-                raise typer.Exit(1)
-
-        await runner.rollback_migrations(n=n, apply_repeatable=repeatable)
+    with _reporting_lock_timeout():
+        async with FluxRunner.from_file(
+            path=FLUX_CONFIG_FILE,
+            connection_uri=connection_uri,
+        ) as runner:
+            _print_rollback_report(runner=runner, n=n)
+            if not auto_approve:
+                if not Confirm.ask("Undo these migrations?"):
+                    raise typer.Exit(1)
+
+            await runner.rollback_migrations(
+                n=n, apply_repeatable=repeatable, force_repeatable=force_repeatable
+            )
 
 
 @app.command()
@@ -347,6 +586,12 @@ def rollback(
     ] = None,
     auto_approve: bool = False,
     repeatable: bool | None = None,
+    force_repeatable: Annotated[
+        bool,
+        typer.Option(
+            help="Apply all repeatable migrations, even if they haven't changed and no migrations are pending"  # noqa: E501
+        ),
+    ] = False,
 ):
     async_run(
         _rollback(
@@ -355,5 +600,185 @@ def rollback(
             n=n,
             auto_approve=auto_approve,
             repeatable=repeatable,
+            force_repeatable=force_repeatable,
+        )
+    )
+
+
+def _squashed_migration_files(config: FluxConfig, squashed: dict[str, str]):
+    """
+    Get the files of the migrations replaced by a baseline migration
+    """
+    suffixes = [".sql", ".undo.sql", ".py", BASELINE_MIGRATION_SUFFIX]
+    return sorted(
+        filename
+        for filename in os.listdir(config.migration_directory)
+        if any(
+            filename == f"{migration_id}{suffix}"
+            for migration_id in squashed
+            for suffix in suffixes
+        )
+    )
+
+
+async def _squash(
+    ctx: typer.Context,
+    connection_uri: str,
+    until: str,
+    auto_approve: bool = False,
+):
+    config: FluxConfig | None = ctx.obj.config
+    if config is None:
+        print("Please run `flux init` to create a configuration file")
+        raise typer.Exit(code=1)
+    with _reporting_lock_timeout():
+        async with FluxRunner.from_file(
+            path=FLUX_CONFIG_FILE,
+            connection_uri=connection_uri,
+        ) as runner:
+            try:
+                baseline = await runner.squash_migrations(until=until)
+            except (MigrationSquashError, SchemaDumpError, NotImplementedError) as e:
+                print(str(e))
+                raise typer.Exit(code=1)
+
+    squashed_files = _squashed_migration_files(config, baseline.squashed)
+    baseline_file = f"{baseline.id}{BASELINE_MIGRATION_SUFFIX}"
+    print(
+        f"Squashing {len(baseline.squashed)} migrations into {baseline_file}, "
+        f"removing {len(squashed_files)} files"
+    )
+    if not auto_approve:
+        if not Confirm.ask("Squash these migrations?"):
+            raise typer.Exit(1)
+
+    with open(os.path.join(config.migration_directory, baseline_file), "w") as f:
+        f.write(baseline.up)
+    for filename in squashed_files:
+        if filename != baseline_file:
+            os.remove(os.path.join(config.migration_directory, filename))
+
+
+@app.command()
+def squash(
+    ctx: typer.Context,
+    connection_uri: Annotated[
+        str,
+        typer.Argument(
+            help="Connection URI of an empty scratch database to build the baseline in"  # noqa: E501
+        ),
+    ],
+    until: Annotated[
+        str,
+        typer.Option(help="ID of the last migration to squash into the baseline"),
+    ],
+    auto_approve: bool = False,
+):
+    async_run(
+        _squash(
+            ctx,
+            connection_uri=connection_uri,
+            until=until,
+            auto_approve=auto_approve,
         )
     )
+
+
+template_app = typer.Typer(
+    help="Provision migrated databases by cloning a template database"
+)
+app.add_typer(template_app, name="template")
+
+
+async def _template_create(ctx: typer.Context, connection_uri: str):
+    if ctx.obj.config is None:
+        print("Please run `flux init` to create a configuration file")
+        raise typer.Exit(code=1)
+    runner = FluxRunner.from_file(path=FLUX_CONFIG_FILE, connection_uri=connection_uri)
+    with _reporting_lock_timeout():
+        try:
+            built = await runner.build_template()
+        except NotImplementedError as e:
+            print(str(e))
+            raise typer.Exit(code=1)
+    if built:
+        print("Built the template database")
+    else:
+        print("The template database is up to date")
+
+
+@template_app.command("create")
+def template_create(
+    ctx: typer.Context,
+    connection_uri: Annotated[
+        str,
+        typer.Argument(
+            help="Connection URI of the template database, which is dropped and rebuilt whenever the migrations change"  # noqa: E501
+        ),
+    ],
+):
+    async_run(_template_create(ctx, connection_uri=connection_uri))
+
+
+async def _template_clone(
+    ctx: typer.Context, connection_uri: str, name: str | None = None
+):
+    if ctx.obj.config is None:
+        print("Please run `flux init` to create a configuration file")
+        raise typer.Exit(code=1)
+    runner = FluxRunner.from_file(path=FLUX_CONFIG_FILE, connection_uri=connection_uri)
+    with _reporting_lock_timeout():
+        try:
+            clone_uri = await runner.clone_template(name)
+        except NotImplementedError as e:
+            print(str(e))
+            raise typer.Exit(code=1)
+    typer.echo(clone_uri)
+
+
+@template_app.command("clone")
+def template_clone(
+    ctx: typer.Context,
+    connection_uri: Annotated[
+        str,
+        typer.Argument(
+            help="Connection URI of the template database, which is built first if it's missing or out of date"  # noqa: E501
+        ),
+    ],
+    name: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Name of the new database (defaults to the template's name with a random suffix)"  # noqa: E501
+        ),
+    ] = None,
+):
+    async_run(_template_clone(ctx, connection_uri=connection_uri, name=name))
+
+
+@app.command()
+def lint(
+    ctx: typer.Context,
+    since: Annotated[
+        Optional[str],
+        typer.Option(help="Only report problems in migrations after this migration ID"),
+    ] = None,
+    jobs: Annotated[
+        Optional[int],
+        typer.Option(help="Number of processes to lint with (defaults to all CPUs)"),
+    ] = None,
+):
+    config: FluxConfig | None = ctx.obj.config
+    if config is None:
+        print("Please run `flux init` to create a configuration file")
+        raise typer.Exit(code=1)
+
+    from flux.builtins.postgres_lint import lint_migrations
+
+    violations = lint_migrations(
+        read_migrations(config=config),
+        since=since,
+        jobs=jobs,
+    )
+    typer.echo(json.dumps([dataclasses.asdict(v) for v in violations], indent=2))
+    if violations:
+        raise typer.Exit(code=1)
@@ -10,8 +10,10 @@ from flux.constants import (
     FLUX_DEFAULT_APPLY_REPEATABLE_ON_DOWN,
     FLUX_DEFAULT_LOG_LEVEL,
     FLUX_GENERAL_CONFIG_SECTION_NAME,
+    FLUX_LOCK_IMPACT_THRESHOLD_BYTES_KEY,
     FLUX_LOG_LEVEL_KEY,
     FLUX_MIGRATION_DIRECTORY_KEY,
+    FLUX_SNAPSHOT_DIRECTORY_KEY,
 )
 from flux.exceptions import InvalidConfigurationError
 
@@ -28,6 +30,10 @@ class FluxConfig:
 
     backend_config: dict[str, Any]
 
+    lock_impact_threshold_bytes: int | None = None
+
+    snapshot_directory: str | None = None
+
     @classmethod
     def from_file(cls, path: str):
         with open(path) as f:
@@ -54,6 +60,12 @@ class FluxConfig:
 
         log_level = general_config.get(FLUX_LOG_LEVEL_KEY, FLUX_DEFAULT_LOG_LEVEL)
 
+        lock_impact_threshold_bytes = general_config.get(
+            FLUX_LOCK_IMPACT_THRESHOLD_BYTES_KEY
+        )
+
+        snapshot_directory = general_config.get(FLUX_SNAPSHOT_DIRECTORY_KEY)
+
         backend_config = config.get(FLUX_BACKEND_CONFIG_SECTION_NAME, {})
 
         return cls(
@@ -62,4 +74,6 @@ class FluxConfig:
             log_level=log_level,
             apply_repeatable_on_down=apply_repeatable_on_down,
             backend_config=backend_config,
+            lock_impact_threshold_bytes=lock_impact_threshold_bytes,
+            snapshot_directory=snapshot_directory,
         )
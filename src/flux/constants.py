@@ -5,6 +5,12 @@ DEFAULT_LOG_LEVEL = "INFO"
 PRE_APPLY_DIRECTORY = "pre-apply"
 POST_APPLY_DIRECTORY = "post-apply"
 
+BASELINE_MIGRATION_SUFFIX = ".baseline.sql"
+
+EXPAND_PHASE = "expand"
+CONTRACT_PHASE = "contract"
+MIGRATION_PHASES = [EXPAND_PHASE, CONTRACT_PHASE]
+
 FLUX_CONFIG_FILE = "flux.toml"
 
 FLUX_GENERAL_CONFIG_SECTION_NAME = "flux"
@@ -14,6 +20,8 @@ FLUX_BACKEND_KEY = "backend"
 FLUX_MIGRATION_DIRECTORY_KEY = "migration_directory"
 FLUX_LOG_LEVEL_KEY = "log_level"
 FLUX_APPLY_REPEATABLE_ON_DOWN_KEY = "apply_repeatable_on_undo"
+FLUX_LOCK_IMPACT_THRESHOLD_BYTES_KEY = "lock_impact_threshold_bytes"
+FLUX_SNAPSHOT_DIRECTORY_KEY = "snapshot_directory"
 
 FLUX_DEFAULT_MIGRATION_DIRECTORY = "migrations"
 FLUX_DEFAULT_LOG_LEVEL = "INFO"
@@ -46,7 +46,44 @@ class MigrationDirectoryCorruptedError(FluxMigrationException):
     """
 
 
+class MigrationLockTimeoutError(FluxMigrationException):
+    """
+    Raised when the migration lock can't be acquired in time
+    """
+
+    def __init__(self, message: str, blockers: list | None = None):
+        super().__init__(message)
+
+        #: The sessions holding the lock when the timeout was reached
+        self.blockers = blockers or []
+
+
 class MigrationApplyError(FluxMigrationException):
     """
     Raised when a migration fails to apply
     """
+
+
+class LockImpactThresholdExceededError(FluxMigrationException):
+    """
+    Raised when migrations would rewrite or scan more data than the configured
+    threshold while blocking writes
+    """
+
+
+class InvalidIndexError(FluxMigrationException):
+    """
+    Raised when an index migration's index is still invalid after rebuilding it
+    """
+
+
+class MigrationSquashError(FluxMigrationException):
+    """
+    Raised when migrations can't be squashed into a baseline migration
+    """
+
+
+class SchemaDumpError(FluxMigrationException):
+    """
+    Raised when the database schema can't be dumped
+    """
@@ -1,5 +1,5 @@
 import hashlib
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 
 @dataclass
@@ -7,10 +7,26 @@ class Migration:
     id: str
     up: str
     down: str | None
+    settings: dict[str, str] = field(default_factory=dict)
+    indexes: list[str] = field(default_factory=list)
+    phase: str | None = None
+    defines: list[str] = field(default_factory=list)
+    group: str | None = None
+    squashed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def is_baseline(self) -> bool:
+        """
+        Whether this is a baseline migration that replaces the squashed
+        migrations before it
+        """
+        return bool(self.squashed)
 
     @property
     def up_hash(self) -> str:
         """
-        Return the hash of the up-migration content
+        Return the hash of the up-migration content, including any index
+        definitions
         """
-        return hashlib.md5(self.up.encode()).hexdigest()
+        content = "\n".join([self.up, *self.indexes]) if self.indexes else self.up
+        return hashlib.md5(content.encode()).hexdigest()
@@ -1,23 +1,212 @@
 import logging
 import os
+import re
 
 from flux.config import FluxConfig
-from flux.constants import POST_APPLY_DIRECTORY, PRE_APPLY_DIRECTORY
+from flux.constants import (
+    BASELINE_MIGRATION_SUFFIX,
+    MIGRATION_PHASES,
+    POST_APPLY_DIRECTORY,
+    PRE_APPLY_DIRECTORY,
+)
 from flux.exceptions import MigrationLoadingError
 from flux.migration.migration import Migration
 from flux.migration.temporary_module import temporary_module
 
 logger = logging.getLogger(__name__)
 
+_SQL_SETTING_DIRECTIVE = re.compile(
+    r"^\s*--\s*flux:set\s+([A-Za-z_][\w.]*)\s*=\s*(.*?)\s*;?\s*$", re.MULTILINE
+)
+
+_SQL_PHASE_DIRECTIVE = re.compile(r"^\s*--\s*flux:phase\s+(\S+)\s*$", re.MULTILINE)
+
+_SQL_SQUASHED_DIRECTIVE = re.compile(
+    r"^\s*--\s*flux:squashed\s+(\S+)\s+([0-9a-f]+)\s*$", re.MULTILINE
+)
+
+_SQL_GROUP_DIRECTIVE = re.compile(r"^\s*--\s*flux:group\s+(\S+)\s*$", re.MULTILINE)
+
+_SQL_DEFINES_DIRECTIVE = re.compile(r"^\s*--\s*flux:defines\s+(.+?)\s*$", re.MULTILINE)
+
+
+def _validate_phase(phase: str | None) -> str | None:
+    if phase is not None and phase not in MIGRATION_PHASES:
+        raise MigrationLoadingError(
+            f"Migration phase must be one of {', '.join(MIGRATION_PHASES)}"
+        )
+    return phase
+
+
+def _read_sql_phase(content: str) -> str | None:
+    """
+    Read the phase declared in SQL migration content with a comment such as
+    ``-- flux:phase expand``
+    """
+    match = _SQL_PHASE_DIRECTIVE.search(content)
+    return _validate_phase(match.group(1) if match else None)
+
+
+def _read_sql_settings(content: str) -> dict[str, str]:
+    """
+    Read session settings declared in SQL migration content with comments such
+    as ``-- flux:set maintenance_work_mem = '1GB'``
+    """
+    settings = {}
+    for name, value in _SQL_SETTING_DIRECTIVE.findall(content):
+        if len(value) >= 2 and value[0] == value[-1] == "'":
+            value = value[1:-1]
+        settings[name] = value
+    return settings
+
+
+def _read_python_settings(module) -> dict[str, str]:
+    """
+    Read session settings declared in a Python migration module's ``settings``
+    dictionary
+    """
+    settings = getattr(module, "settings", {})
+    if not isinstance(settings, dict) or not all(
+        isinstance(name, str) for name in settings
+    ):
+        raise MigrationLoadingError(
+            "Migration settings must be a dictionary with string keys"
+        )
+    return dict(settings)
+
+
+def _read_sql_defines(content: str) -> list[str]:
+    """
+    Read the database objects declared as defined by SQL migration content
+    with comments such as ``-- flux:defines view1, view2``
+    """
+    return [
+        name.strip()
+        for match in _SQL_DEFINES_DIRECTIVE.finditer(content)
+        for name in match.group(1).split(",")
+        if name.strip()
+    ]
+
+
+def _read_sql_group(content: str) -> str | None:
+    """
+    Read the concurrency group declared in SQL migration content with a
+    comment such as ``-- flux:group grants``
+    """
+    match = _SQL_GROUP_DIRECTIVE.search(content)
+    return match.group(1) if match else None
+
+
+def _read_python_group(module) -> str | None:
+    """
+    Read the concurrency group declared in a Python migration module's
+    ``group`` attribute
+    """
+    group = getattr(module, "group", None)
+    if group is not None and not isinstance(group, str):
+        raise MigrationLoadingError("Migration group must be a string")
+    return group
+
+
+def _read_python_defines(module) -> list[str]:
+    """
+    Read the database objects declared as defined by a Python migration
+    module's ``defines`` list
+    """
+    defines = getattr(module, "defines", [])
+    if not isinstance(defines, list) or not all(
+        isinstance(name, str) for name in defines
+    ):
+        raise MigrationLoadingError("Migration defines must be a list of strings")
+    return list(defines)
+
+
+def _read_python_indexes(module) -> list[str]:
+    """
+    Read the index definitions returned by a Python index migration module's
+    ``indexes`` function
+    """
+    try:
+        indexes = module.indexes()
+    except Exception as e:
+        raise MigrationLoadingError("Error reading migration indexes") from e
+    if not isinstance(indexes, list) or not all(
+        isinstance(index, str) for index in indexes
+    ):
+        raise MigrationLoadingError("Migration indexes must be a list of strings")
+    return indexes
+
+
+def format_baseline_migration(squashed: dict[str, str], schema: str) -> str:
+    """
+    Format the content of a baseline migration that replaces the squashed
+    migrations, given as their hashes keyed by ID, with the given schema
+    """
+    header = "".join(
+        f"-- flux:squashed {migration_id} {up_hash}\n"
+        for migration_id, up_hash in squashed.items()
+    )
+    return f"{header}\n{schema}"
+
+
+def parse_baseline_migration(*, migration_id: str, content: str) -> Migration:
+    """
+    Parse the content of a baseline migration and return a Migration object.
+    The migration's ID is the ID of the last migration it replaces.
+    """
+    squashed = {
+        match.group(1): match.group(2)
+        for match in _SQL_SQUASHED_DIRECTIVE.finditer(content)
+    }
+    if max(squashed, default=None) != migration_id:
+        raise MigrationLoadingError(
+            f"Baseline migration {migration_id} must list the migrations it "
+            "squashed, ending with itself"
+        )
+
+    return Migration(
+        id=migration_id,
+        up=content,
+        down=None,
+        settings=_read_sql_settings(content),
+        squashed=squashed,
+    )
+
+
+def read_baseline_migration(*, config: FluxConfig, migration_id: str) -> Migration:
+    """
+    Read a baseline migration file and return a Migration object
+    """
+    baseline_file = os.path.join(
+        config.migration_directory, f"{migration_id}{BASELINE_MIGRATION_SUFFIX}"
+    )
+
+    try:
+        with open(baseline_file) as f:
+            content = f.read()
+    except Exception as e:
+        raise MigrationLoadingError("Error reading baseline migration") from e
+
+    return parse_baseline_migration(migration_id=migration_id, content=content)
+
 
 def read_migrations(*, config: FluxConfig) -> list[Migration]:
     """
     Read all normal migrations in the migration directory and return a list of
-    Migration objects in apply order
+    Migration objects in apply order.
+
+    Migrations squashed into a baseline migration are replaced by it.
     """
     migrations = []
     for migration_file in os.listdir(config.migration_directory):
-        if migration_file.endswith(".sql") and not migration_file.endswith(".undo.sql"):
+        if migration_file.endswith(BASELINE_MIGRATION_SUFFIX):
+            migration_id = migration_file[: -len(BASELINE_MIGRATION_SUFFIX)]
+            migrations.append(
+                read_baseline_migration(config=config, migration_id=migration_id)
+            )
+        elif migration_file.endswith(".sql") and not migration_file.endswith(
+            ".undo.sql"
+        ):
             migration_id = migration_file[:-4]
             migrations.append(
                 read_sql_migration(config=config, migration_id=migration_id)
@@ -28,7 +217,15 @@ def read_migrations(*, config: FluxConfig) -> list[Migration]:
                 read_python_migration(config=config, migration_id=migration_id)
             )
 
-    return sorted(migrations, key=lambda m: m.id)
+    baselines = [m for m in migrations if m.is_baseline]
+    return sorted(
+        (
+            m
+            for m in migrations
+            if not any(m is not b and m.id in b.squashed for b in baselines)
+        ),
+        key=lambda m: m.id,
+    )
 
 
 def _read_repeatable_migrations(
@@ -112,7 +309,13 @@ def read_sql_migration(*, config: FluxConfig, migration_id: str) -> Migration:
         except Exception as e:
             raise MigrationLoadingError("Error reading down migration") from e
 
-    return Migration(id=migration_id, up=up, down=down)
+    return Migration(
+        id=migration_id,
+        up=up,
+        down=down,
+        settings=_read_sql_settings(up),
+        phase=_read_sql_phase(up),
+    )
 
 
 def read_repeatable_sql_migration(
@@ -141,7 +344,14 @@ def read_repeatable_sql_migration(
     ):
         raise MigrationLoadingError("Repeatable migrations cannot have a down")
 
-    return Migration(id=migration_id, up=up, down=None)
+    return Migration(
+        id=migration_id,
+        up=up,
+        down=None,
+        settings=_read_sql_settings(up),
+        defines=_read_sql_defines(up),
+        group=_read_sql_group(up),
+    )
 
 
 def read_python_migration(*, config: FluxConfig, migration_id: str) -> Migration:
@@ -151,12 +361,21 @@ def read_python_migration(*, config: FluxConfig, migration_id: str) -> Migration
     migration_file = os.path.join(config.migration_directory, f"{migration_id}.py")
 
     with temporary_module(migration_file) as module:
-        try:
-            up_migration = module.apply()
-        except Exception as e:
-            raise MigrationLoadingError("Error reading up migration") from e
-        if not isinstance(up_migration, str):
-            raise MigrationLoadingError("Up migration must return a string")
+        if hasattr(module, "indexes"):
+            if hasattr(module, "apply"):
+                raise MigrationLoadingError(
+                    "Index migrations cannot also have an apply function"
+                )
+            up_migration = ""
+            indexes = _read_python_indexes(module)
+        else:
+            try:
+                up_migration = module.apply()
+            except Exception as e:
+                raise MigrationLoadingError("Error reading up migration") from e
+            if not isinstance(up_migration, str):
+                raise MigrationLoadingError("Up migration must return a string")
+            indexes = []
         if hasattr(module, "undo"):
             try:
                 down_migration = module.undo()
@@ -166,8 +385,17 @@ def read_python_migration(*, config: FluxConfig, migration_id: str) -> Migration
                 raise MigrationLoadingError("Down migration must return a string")
         else:
             down_migration = None
+        settings = _read_python_settings(module)
+        phase = _validate_phase(getattr(module, "phase", None))
 
-    return Migration(id=migration_id, up=up_migration, down=down_migration)
+    return Migration(
+        id=migration_id,
+        up=up_migration,
+        down=down_migration,
+        settings=settings,
+        indexes=indexes,
+        phase=phase,
+    )
 
 
 def read_repeatable_python_migration(
@@ -192,5 +420,17 @@ def read_repeatable_python_migration(
             raise MigrationLoadingError("Up migration must return a string")
         if hasattr(module, "undo"):
             raise MigrationLoadingError("Repeatable migrations cannot have a down")
+        if hasattr(module, "indexes"):
+            raise MigrationLoadingError("Repeatable migrations cannot have indexes")
+        settings = _read_python_settings(module)
+        defines = _read_python_defines(module)
+        group = _read_python_group(module)
 
-    return Migration(id=migration_id, up=up_migration, down=None)
+    return Migration(
+        id=migration_id,
+        up=up_migration,
+        down=None,
+        settings=settings,
+        defines=defines,
+        group=group,
+    )
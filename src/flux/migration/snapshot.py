@@ -0,0 +1,72 @@
+import hashlib
+import os
+
+from flux.config import FluxConfig
+from flux.constants import POST_APPLY_DIRECTORY, PRE_APPLY_DIRECTORY
+from flux.exceptions import MigrationLoadingError
+from flux.migration.migration import Migration
+from flux.migration.read_migration import _read_sql_settings
+
+
+def snapshot_key(
+    *,
+    backend: str,
+    pre_apply_migrations: list[Migration],
+    migrations: list[Migration],
+    post_apply_migrations: list[Migration],
+) -> str:
+    """
+    Get the key of the snapshot of a database with all of the given migrations
+    applied, from the hash of their ordered IDs and hashes
+    """
+    content = "\n".join(
+        [
+            backend,
+            *(
+                f"{kind} {migration.id} {migration.up_hash}"
+                for kind, kind_migrations in [
+                    (PRE_APPLY_DIRECTORY, pre_apply_migrations),
+                    ("migration", migrations),
+                    (POST_APPLY_DIRECTORY, post_apply_migrations),
+                ]
+                for migration in kind_migrations
+            ),
+        ]
+    )
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def _snapshot_file(config: FluxConfig, key: str) -> str:
+    if config.snapshot_directory is None:
+        raise ValueError("No snapshot directory is configured")
+    return os.path.join(config.snapshot_directory, f"{key}.sql")
+
+
+def read_snapshot(*, config: FluxConfig, key: str) -> Migration | None:
+    """
+    Read the snapshot with the given key from the snapshot directory as a
+    Migration object, if it exists
+    """
+    snapshot_file = _snapshot_file(config, key)
+    if not os.path.exists(snapshot_file):
+        return None
+
+    try:
+        with open(snapshot_file) as f:
+            up = f.read()
+    except Exception as e:
+        raise MigrationLoadingError("Error reading snapshot") from e
+
+    return Migration(id=key, up=up, down=None, settings=_read_sql_settings(up))
+
+
+def write_snapshot(*, config: FluxConfig, key: str, content: str):
+    """
+    Write a snapshot with the given key to the snapshot directory
+    """
+    snapshot_file = _snapshot_file(config, key)
+    os.makedirs(os.path.dirname(snapshot_file) or ".", exist_ok=True)
+    temporary_file = f"{snapshot_file}.tmp"
+    with open(temporary_file, "w") as f:
+        f.write(content)
+    os.replace(temporary_file, snapshot_file)
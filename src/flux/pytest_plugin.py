@@ -0,0 +1,130 @@
+"""
+Pytest fixtures that provide migrated databases to tests by cloning a template
+database that is migrated once per test session.
+
+Configure the template database with ``--flux-template-database`` or the
+``flux_template_database`` ini option, and the flux configuration file with
+``--flux-config`` or ``flux_config`` (default ``flux.toml``).
+"""
+
+import asyncio
+from typing import AsyncGenerator, Generator
+
+import pytest
+
+from flux.backend.base import MigrationBackend
+from flux.constants import FLUX_CONFIG_FILE
+from flux.runner import FluxRunner
+
+try:
+    import pytest_asyncio
+except ImportError:  # pragma: no cover
+    pytest_asyncio = None
+
+TEMPLATE_DATABASE_OPTION = "flux_template_database"
+CONFIG_OPTION = "flux_config"
+
+
+class _Rollback(Exception):
+    """
+    Raised to roll back the transaction a test runs in
+    """
+
+
+def pytest_addoption(parser: pytest.Parser):
+    group = parser.getgroup("flux", "flux migrated test databases")
+    group.addoption(
+        "--flux-template-database",
+        dest=TEMPLATE_DATABASE_OPTION,
+        help="Connection URI of the template database to clone test databases from",
+    )
+    group.addoption(
+        "--flux-config",
+        dest=CONFIG_OPTION,
+        help=f"Path to the flux configuration file (default {FLUX_CONFIG_FILE})",
+    )
+    parser.addini(
+        TEMPLATE_DATABASE_OPTION,
+        "Connection URI of the template database to clone test databases from",
+    )
+    parser.addini(
+        CONFIG_OPTION,
+        f"Path to the flux configuration file (default {FLUX_CONFIG_FILE})",
+        default=FLUX_CONFIG_FILE,
+    )
+
+
+def _option(config: pytest.Config, name: str) -> str | None:
+    return config.getoption(name) or config.getini(name) or None
+
+
+@pytest.fixture(scope="session")
+def flux_runner(request: pytest.FixtureRequest) -> FluxRunner:
+    """
+    A runner for the template database, which is built with every migration
+    applied once per session, and rebuilt if the migrations changed since it
+    was last built. Under ``pytest-xdist`` only the first worker builds it.
+    """
+    template_uri = _option(request.config, TEMPLATE_DATABASE_OPTION)
+    if template_uri is None:
+        raise pytest.UsageError(
+            "Please set --flux-template-database or the flux_template_database "
+            "ini option to use flux's database fixtures"
+        )
+    runner = FluxRunner.from_file(
+        path=_option(request.config, CONFIG_OPTION) or FLUX_CONFIG_FILE,
+        connection_uri=template_uri,
+    )
+    asyncio.run(runner.build_template())
+    return runner
+
+
+def _clone(runner: FluxRunner) -> Generator[str, None, None]:
+    clone_uri = asyncio.run(runner.clone_template())
+    try:
+        yield clone_uri
+    finally:
+        asyncio.run(runner.backend.drop_clone(clone_uri))
+
+
+@pytest.fixture(scope="session")
+def flux_worker_database(flux_runner: FluxRunner) -> Generator[str, None, None]:
+    """
+    The connection URI of a migrated database shared by the tests of this
+    session, or of this worker under ``pytest-xdist``. Tests that change it
+    should use ``flux_backend`` to roll their changes back.
+    """
+    yield from _clone(flux_runner)
+
+
+@pytest.fixture
+def flux_database(flux_runner: FluxRunner) -> Generator[str, None, None]:
+    """
+    The connection URI of a migrated database cloned for this test alone,
+    which is dropped afterwards
+    """
+    yield from _clone(flux_runner)
+
+
+if pytest_asyncio is not None:
+
+    @pytest_asyncio.fixture
+    async def flux_backend(
+        flux_runner: FluxRunner, flux_worker_database: str
+    ) -> AsyncGenerator[MigrationBackend, None]:
+        """
+        A backend connected to ``flux_worker_database`` within a transaction
+        that is rolled back after the test, so that tests sharing the database
+        are isolated from each other. Transactions opened by the test become
+        savepoints.
+        """
+        backend = type(flux_runner.backend).from_config(
+            flux_runner.config, flux_worker_database
+        )
+        async with backend.connection():
+            try:
+                async with backend.transaction():
+                    yield backend
+                    raise _Rollback()
+            except _Rollback:
+                pass
@@ -1,17 +1,58 @@
-from contextlib import AsyncExitStack
+import asyncio
+import sys
+from contextlib import AsyncExitStack, nullcontext
 from dataclasses import dataclass, field
 
 from flux.backend.applied_migration import AppliedMigration
 from flux.backend.base import MigrationBackend
+from flux.backend.explained_statement import ExplainedStatement
 from flux.backend.get_backends import get_backend
+from flux.backend.lock_impact import LockImpact
 from flux.config import FluxConfig
-from flux.exceptions import MigrationApplyError, MigrationDirectoryCorruptedError
+from flux.constants import (
+    CONTRACT_PHASE,
+    EXPAND_PHASE,
+    POST_APPLY_DIRECTORY,
+    PRE_APPLY_DIRECTORY,
+)
+from flux.exceptions import (
+    LockImpactThresholdExceededError,
+    MigrationApplyError,
+    MigrationDirectoryCorruptedError,
+    MigrationSquashError,
+)
 from flux.migration.migration import Migration
 from flux.migration.read_migration import (
+    format_baseline_migration,
+    parse_baseline_migration,
     read_migrations,
     read_post_apply_migrations,
     read_pre_apply_migrations,
 )
+from flux.migration.snapshot import read_snapshot, snapshot_key, write_snapshot
+
+
+def _repeatable_stages(migrations: list[Migration]) -> list[list[list[Migration]]]:
+    """
+    Split repeatable migrations into stages that run one after another.
+
+    Each stage is a list of sequences of migrations that are independent of
+    each other. Consecutive grouped migrations form a stage with a sequence
+    per group, in order, and each ungrouped migration forms a stage of its own.
+    """
+    stages: list[list[list[Migration]]] = []
+    groups: dict[str, list[Migration]] = {}
+    for migration in migrations:
+        if migration.group is None:
+            if groups:
+                stages.append(list(groups.values()))
+                groups = {}
+            stages.append([[migration]])
+        else:
+            groups.setdefault(migration.group, []).append(migration)
+    if groups:
+        stages.append(list(groups.values()))
+    return stages
 
 
 @dataclass
@@ -34,6 +75,9 @@ class FluxRunner:
 
     applied_migrations: set[AppliedMigration] = field(init=False)
 
+    #: Whether the database was uninitialized before this runner initialized it
+    fresh_database: bool = field(init=False)
+
     @classmethod
     def from_file(cls, path: str, connection_uri: str) -> "FluxRunner":
         config = FluxConfig.from_file(path)
@@ -44,74 +88,325 @@ class FluxRunner:
         self._exit_stack = AsyncExitStack()
         await self._exit_stack.__aenter__()
 
-        await self._exit_stack.enter_async_context(self.backend.connection())
-        await self._exit_stack.enter_async_context(self.backend.migration_lock())
+        try:
+            await self._exit_stack.enter_async_context(self.backend.connection())
+            await self._exit_stack.enter_async_context(self.backend.migration_lock())
 
-        if not await self.backend.is_initialized():
-            async with self.backend.transaction():
-                await self.backend.initialize()
+            self.fresh_database = not await self.backend.is_initialized()
+            if self.fresh_database:
+                async with self.backend.transaction():
+                    await self.backend.initialize()
 
-        self.pre_apply_migrations = read_pre_apply_migrations(config=self.config)
-        self.migrations = read_migrations(config=self.config)
-        self.post_apply_migrations = read_post_apply_migrations(config=self.config)
+            self.pre_apply_migrations = read_pre_apply_migrations(config=self.config)
+            self.migrations = read_migrations(config=self.config)
+            self.post_apply_migrations = read_post_apply_migrations(config=self.config)
 
-        self.applied_migrations = await self.backend.get_applied_migrations()
+            self.applied_migrations = await self.backend.get_applied_migrations()
+        except BaseException:
+            await self._exit_stack.__aexit__(*sys.exc_info())
+            raise
 
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
         await self._exit_stack.__aexit__(exc_type, exc, tb)
 
+    def _expected_applied_migrations(
+        self, applied_hashes: dict[str, str]
+    ) -> list[tuple[str, str, str | None]]:
+        """
+        Get the ID, hash and phase that each migration is recorded with once
+        applied, in order.
+
+        A baseline migration is recorded under its own ID if it was applied
+        itself, or as the migrations it squashed if they were applied before
+        they were squashed.
+        """
+        expected: list[tuple[str, str, str | None]] = []
+        for migration in self.migrations:
+            if not migration.is_baseline:
+                expected.append((migration.id, migration.up_hash, migration.phase))
+            elif applied_hashes.get(migration.id) == migration.squashed[migration.id]:
+                expected.extend(
+                    (squashed_id, squashed_hash, None)
+                    for squashed_id, squashed_hash in migration.squashed.items()
+                )
+            elif migration.id not in applied_hashes and any(
+                squashed_id in applied_hashes for squashed_id in migration.squashed
+            ):
+                raise MigrationDirectoryCorruptedError(
+                    f"Only some of the migrations squashed into baseline "
+                    f"{migration.id} have been applied"
+                )
+            else:
+                expected.append((migration.id, migration.up_hash, None))
+        return expected
+
     async def validate_applied_migrations(self):
         """
         Confirms the following for applied migrations:
-        - There is no discontinuity in the applied migrations
+        - There is no discontinuity in the applied migrations, other than
+          contract-phase migrations skipped while applying the expand phase
         - The migration hashes of all applied migrations haven't changed
+
+        Databases that applied migrations before they were squashed into a
+        baseline migration are validated against the squashed migrations.
         """
         applied_migrations = sorted(self.applied_migrations, key=lambda m: m.id)
         if not applied_migrations:
             return
 
+        applied_hashes = {m.id: m.hash for m in applied_migrations}
         last_applied_migration = applied_migrations[-1]
         applied_migration_files = [
-            m for m in self.migrations if m.id <= last_applied_migration.id
+            (migration_id, up_hash)
+            for migration_id, up_hash, phase in self._expected_applied_migrations(
+                applied_hashes
+            )
+            if migration_id <= last_applied_migration.id
+            and (migration_id in applied_hashes or phase != CONTRACT_PHASE)
         ]
 
-        if [m.id for m in applied_migration_files] != [
+        if [migration_id for migration_id, _ in applied_migration_files] != [
             m.id for m in applied_migrations
         ]:
             raise MigrationDirectoryCorruptedError(
                 "There is a discontinuity in the applied migrations"
             )
 
-        for migration in applied_migration_files:
-            applied_migration = next(
-                m for m in self.applied_migrations if m.id == migration.id
-            )
-            if applied_migration.hash != migration.up_hash:
+        for migration_id, up_hash in applied_migration_files:
+            if applied_hashes[migration_id] != up_hash:
                 raise MigrationDirectoryCorruptedError(
-                    f"Migration {migration.id} has changed since it was applied"
+                    f"Migration {migration_id} has changed since it was applied"
                 )
 
-    async def _apply_pre_apply_migrations(self):
-        for migration in self.pre_apply_migrations:
-            try:
-                async with self.backend.transaction():
-                    await self.backend.apply_migration(migration.up)
-            except Exception as e:
-                raise MigrationApplyError(
-                    f"Failed to apply pre-apply migration {migration.id}"
-                ) from e
-
-    async def _apply_post_apply_migrations(self):
-        for migration in self.post_apply_migrations:
-            try:
-                async with self.backend.transaction():
-                    await self.backend.apply_migration(migration.up)
-            except Exception as e:
-                raise MigrationApplyError(
-                    f"Failed to apply post-apply migration {migration.id}"
-                ) from e
+    async def _get_applied_repeatable_hashes(self, kind: str) -> dict[str, str] | None:
+        try:
+            return await self.backend.get_applied_repeatable_migrations(kind)
+        except NotImplementedError:
+            return None
+
+    async def _apply_repeatable_migration(
+        self,
+        backend: MigrationBackend,
+        kind: str,
+        migration: Migration,
+        applied_hashes: dict[str, str] | None,
+    ):
+        async with backend.transaction():
+            async with backend.session_settings(migration.settings):
+                await backend.apply_migration(migration.up)
+            if applied_hashes is not None:
+                await backend.register_repeatable_migration(kind, migration)
+
+    async def _apply_repeatable_sequence(
+        self,
+        workers: asyncio.Queue,
+        kind: str,
+        migrations: list[Migration],
+        applied_hashes: dict[str, str] | None,
+    ) -> tuple[Migration, Exception] | None:
+        """
+        Apply a sequence of repeatable migrations in order on a free worker,
+        stopping at and returning the first failure
+        """
+        backend = await workers.get()
+        try:
+            for migration in migrations:
+                try:
+                    await self._apply_repeatable_migration(
+                        backend, kind, migration, applied_hashes
+                    )
+                except Exception as e:
+                    return migration, e
+            return None
+        finally:
+            workers.put_nowait(backend)
+
+    async def _apply_repeatable_migrations(
+        self,
+        kind: str,
+        migrations: list[Migration],
+        applied_hashes: dict[str, str] | None,
+        atomic: bool = False,
+    ) -> list[Migration]:
+        """
+        Apply the given repeatable migrations of the given kind, returning
+        them.
+
+        Migrations in different groups run concurrently on the backend's
+        workers (see ``_repeatable_stages``), each in its own transaction. If
+        any fail, the rest of the stage still finishes and the first failed
+        migration in order is reported. Otherwise, or if the backend can't run
+        migrations concurrently, migrations run serially in order, all in one
+        transaction if ``atomic``.
+        """
+        stages = _repeatable_stages(migrations)
+        concurrency = max((len(stage) for stage in stages), default=0)
+
+        async with AsyncExitStack() as stack:
+            workers: list[MigrationBackend] = []
+            if concurrency > 1:
+                try:
+                    workers = await stack.enter_async_context(
+                        self.backend.workers(concurrency)
+                    )
+                except NotImplementedError:
+                    pass
+
+            if len(workers) < 2:
+                async with self.backend.transaction() if atomic else nullcontext():
+                    for migration in migrations:
+                        try:
+                            await self._apply_repeatable_migration(
+                                self.backend, kind, migration, applied_hashes
+                            )
+                        except Exception as e:
+                            raise MigrationApplyError(
+                                f"Failed to apply {kind} migration {migration.id}"
+                            ) from e
+                return migrations
+
+            pool: asyncio.Queue = asyncio.Queue()
+            for worker in workers:
+                pool.put_nowait(worker)
+
+            positions = {migration.id: i for i, migration in enumerate(migrations)}
+            for stage in stages:
+                results = await asyncio.gather(
+                    *(
+                        self._apply_repeatable_sequence(
+                            pool, kind, sequence, applied_hashes
+                        )
+                        for sequence in stage
+                    )
+                )
+                failures = sorted(
+                    (result for result in results if result is not None),
+                    key=lambda failure: positions[failure[0].id],
+                )
+                if failures:
+                    migration, error = failures[0]
+                    message = f"Failed to apply {kind} migration {migration.id}"
+                    if len(failures) > 1:
+                        message += " (also failed: {})".format(
+                            ", ".join(m.id for m, _ in failures[1:])
+                        )
+                    raise MigrationApplyError(message) from error
+
+        return migrations
+
+    @staticmethod
+    def _changed_repeatable_migrations(
+        migrations: list[Migration], applied_hashes: dict[str, str] | None
+    ) -> list[Migration]:
+        if applied_hashes is None:
+            return migrations
+        return [m for m in migrations if applied_hashes.get(m.id) != m.up_hash]
+
+    async def _apply_pre_apply_migrations(
+        self, run_all: bool = True
+    ) -> list[Migration]:
+        """
+        Apply pre-apply migrations, returning those that were applied.
+
+        Unless ``run_all``, migrations that haven't changed since they were
+        last applied are skipped. Backends that don't track repeatable
+        migrations always apply them all.
+        """
+        applied_hashes = await self._get_applied_repeatable_hashes(PRE_APPLY_DIRECTORY)
+        migrations = (
+            self.pre_apply_migrations
+            if run_all
+            else self._changed_repeatable_migrations(
+                self.pre_apply_migrations, applied_hashes
+            )
+        )
+        return await self._apply_repeatable_migrations(
+            PRE_APPLY_DIRECTORY, migrations, applied_hashes
+        )
+
+    async def post_apply_migrations_to_run(
+        self,
+        run_all: bool = True,
+        contents: list[str] | None = None,
+    ) -> list[Migration]:
+        """
+        Get the post-apply migrations that should run, in the order they
+        should run in.
+
+        Unless ``run_all``, migrations that haven't changed since they were
+        last applied are skipped.
+
+        If ``contents`` are given, they are the migration content run before
+        post-apply migrations, and post-apply migrations that declare the
+        objects they define are selected by dependency instead: they run only
+        if they changed, if any object they define is missing, or if any
+        object they define depends on a relation touched by the contents or
+        on an object defined by another selected migration. Selected
+        migrations are ordered so that objects run after the objects they
+        depend on. Backends that can't track object dependencies run them as
+        if they declared nothing.
+        """
+        applied_hashes = await self._get_applied_repeatable_hashes(POST_APPLY_DIRECTORY)
+        changed_ids = {
+            m.id
+            for m in self._changed_repeatable_migrations(
+                self.post_apply_migrations, applied_hashes
+            )
+        }
+        default_to_run = [
+            m for m in self.post_apply_migrations if run_all or m.id in changed_ids
+        ]
+
+        declared = [m for m in self.post_apply_migrations if m.defines]
+        if contents is None or not declared:
+            return default_to_run
+
+        objects = [obj for m in declared for obj in m.defines]
+        try:
+            existing = await self.backend.existing_objects(objects)
+        except NotImplementedError:
+            return default_to_run
+
+        roots = [
+            obj
+            for m in declared
+            if m.id in changed_ids or not existing.issuperset(m.defines)
+            for obj in m.defines
+        ]
+        depths = await self.backend.dependent_objects(contents, roots, objects)
+
+        to_run = [
+            m
+            for m in self.post_apply_migrations
+            if (not m.defines and run_all)
+            or m.id in changed_ids
+            or not existing.issuperset(m.defines)
+            or any(obj in depths for obj in m.defines)
+        ]
+        return sorted(
+            to_run,
+            key=lambda m: max((depths.get(obj, 0) for obj in m.defines), default=0),
+        )
+
+    async def _apply_post_apply_migrations(
+        self,
+        run_all: bool = True,
+        contents: list[str] | None = None,
+    ) -> list[Migration]:
+        """
+        Apply post-apply migrations, returning those that were applied (see
+        ``post_apply_migrations_to_run``). Unless some run concurrently, they
+        are applied in a single transaction.
+        """
+        applied_hashes = await self._get_applied_repeatable_hashes(POST_APPLY_DIRECTORY)
+        return await self._apply_repeatable_migrations(
+            POST_APPLY_DIRECTORY,
+            await self.post_apply_migrations_to_run(run_all=run_all, contents=contents),
+            applied_hashes,
+            atomic=True,
+        )
 
     def list_applied_migrations(self) -> list[Migration]:
         """
@@ -133,38 +428,323 @@ class FluxRunner:
             if m.id not in {m.id for m in self.applied_migrations}
         ]
 
-    def migrations_to_apply(self, n: int | None = None):
+    def migrations_to_apply(self, n: int | None = None, phase: str | None = None):
+        """
+        List the migrations that would be applied, in order.
+
+        In the expand phase, these are the unapplied migrations tagged with the
+        expand phase, skipping those tagged with the contract phase and
+        stopping at the first untagged migration. Otherwise, all unapplied
+        migrations are applied.
+        """
         unapplied_migrations = self.list_unapplied_migrations()
+        if phase == EXPAND_PHASE:
+            expand_migrations = []
+            for migration in unapplied_migrations:
+                if migration.phase == CONTRACT_PHASE:
+                    continue
+                if migration.phase != EXPAND_PHASE:
+                    break
+                expand_migrations.append(migration)
+            unapplied_migrations = expand_migrations
         return unapplied_migrations[:n]
 
-    async def apply_migrations(self, n: int | None = None):
+    async def explain_migrations(
+        self, n: int | None = None, phase: str | None = None
+    ) -> dict[str, list[ExplainedStatement]]:
+        """
+        Estimate the cost of each statement of the migrations that would be
+        applied, keyed by migration ID
+        """
+        return {
+            migration.id: await self.backend.explain_migration(migration.up)
+            for migration in self.migrations_to_apply(n=n, phase=phase)
+        }
+
+    async def estimate_lock_impact(
+        self, n: int | None = None, phase: str | None = None
+    ) -> dict[str, list[LockImpact]]:
+        """
+        Estimate the impact of the table locks taken by the migrations that
+        would be applied, keyed by migration ID
+        """
+        return {
+            migration.id: await self.backend.estimate_lock_impact(migration.up)
+            for migration in self.migrations_to_apply(n=n, phase=phase)
+        }
+
+    def lock_impacts_over_threshold(
+        self, lock_impacts: dict[str, list[LockImpact]]
+    ) -> dict[str, list[LockImpact]]:
+        """
+        Filter lock impacts to those that block writes while rewriting or
+        scanning more than the configured threshold, keyed by migration ID
+        """
+        threshold = self.config.lock_impact_threshold_bytes
+        if threshold is None:
+            return {}
+        over_threshold = {
+            migration_id: [
+                impact
+                for impact in impacts
+                if impact.blocks_writes
+                and impact.estimated_bytes is not None
+                and impact.estimated_bytes > threshold
+            ]
+            for migration_id, impacts in lock_impacts.items()
+        }
+        return {
+            migration_id: impacts
+            for migration_id, impacts in over_threshold.items()
+            if impacts
+        }
+
+    async def check_lock_impact(self, n: int | None = None, phase: str | None = None):
+        """
+        Confirm that the migrations that would be applied don't exceed the
+        configured lock impact threshold, if there is one
+        """
+        if self.config.lock_impact_threshold_bytes is None:
+            return
+        over_threshold = self.lock_impacts_over_threshold(
+            await self.estimate_lock_impact(n=n, phase=phase)
+        )
+        if over_threshold:
+            raise LockImpactThresholdExceededError(
+                "Migrations exceed the lock impact threshold: "
+                + ", ".join(over_threshold.keys())
+            )
+
+    async def _apply_migration(self, migration: Migration, register: bool = True):
+        if migration.indexes:
+            await self.backend.build_indexes(
+                migration.indexes, settings=migration.settings
+            )
+        async with self.backend.transaction():
+            async with self.backend.session_settings(migration.settings):
+                await self.backend.apply_migration(migration.up)
+            if register:
+                await self.backend.register_migration(migration)
+
+    def snapshot_key(self) -> str:
+        """
+        Get the key of the snapshot of a database with every migration applied
+        """
+        return snapshot_key(
+            backend=self.config.backend,
+            pre_apply_migrations=self.pre_apply_migrations,
+            migrations=self.migrations,
+            post_apply_migrations=self.post_apply_migrations,
+        )
+
+    async def restore_snapshot(self) -> bool:
+        """
+        Restore the cached snapshot of a database with every migration
+        applied, if there is one, into this database, which must not have any
+        migrations applied. All migrations, including repeatable migrations,
+        are registered as applied in the same transaction.
+
+        Returns whether a snapshot was restored.
+        """
+        if self.config.snapshot_directory is None or self.applied_migrations:
+            return False
+        snapshot = read_snapshot(config=self.config, key=self.snapshot_key())
+        if snapshot is None:
+            return False
+
+        try:
+            async with self.backend.transaction():
+                async with self.backend.session_settings(snapshot.settings):
+                    await self.backend.apply_migration(snapshot.up)
+                await self.backend.register_migrations(self.migrations)
+                for kind, migrations in [
+                    (PRE_APPLY_DIRECTORY, self.pre_apply_migrations),
+                    (POST_APPLY_DIRECTORY, self.post_apply_migrations),
+                ]:
+                    if await self._get_applied_repeatable_hashes(kind) is not None:
+                        for migration in migrations:
+                            await self.backend.register_repeatable_migration(
+                                kind, migration
+                            )
+        except Exception as e:
+            raise MigrationApplyError(
+                f"Failed to restore snapshot {snapshot.id}"
+            ) from e
+
+        self.applied_migrations = await self.backend.get_applied_migrations()
+        return True
+
+    async def save_snapshot(self):
+        """
+        Cache a snapshot of this database, which must have every migration
+        applied, if there's a snapshot directory and the backend can dump its
+        schema and data
+        """
+        if self.config.snapshot_directory is None or self.list_unapplied_migrations():
+            return
+        try:
+            content = await self.backend.dump_schema(include_data=True)
+        except NotImplementedError:
+            return
+        write_snapshot(config=self.config, key=self.snapshot_key(), content=content)
+
+    async def _build_template(self) -> bool:
+        key = snapshot_key(
+            backend=self.config.backend,
+            pre_apply_migrations=read_pre_apply_migrations(config=self.config),
+            migrations=read_migrations(config=self.config),
+            post_apply_migrations=read_post_apply_migrations(config=self.config),
+        )
+        if await self.backend.template_key() == key:
+            return False
+
+        await self.backend.reset_template()
+        async with self:
+            await self.apply_migrations()
+        await self.backend.mark_template(key)
+        return True
+
+    async def build_template(self) -> bool:
+        """
+        Build the template database the backend connects to with every
+        migration applied, unless it was already built with the same
+        migrations. If the migrations changed since, the template is dropped
+        and built again from scratch. Returns whether it was built.
+
+        Unlike most methods, this must be called outside of the runner's
+        context, which it enters itself once the template exists.
+        """
+        async with self.backend.template_lock():
+            return await self._build_template()
+
+    async def clone_template(self, name: str | None = None) -> str:
+        """
+        Create a new database with every migration applied by cloning the
+        template database the backend connects to, building the template
+        first if needed (see ``build_template``). Returns the connection URI
+        of the new database.
+
+        Unlike most methods, this must be called outside of the runner's
+        context, as the template can't be cloned while connected to.
+        """
+        async with self.backend.template_lock():
+            await self._build_template()
+            return await self.backend.clone_template(name)
+
+    async def apply_migrations(
+        self,
+        n: int | None = None,
+        ignore_lock_impact_threshold: bool = False,
+        phase: str | None = None,
+        force_repeatable: bool = False,
+    ):
         """
-        Apply unapplied migrations to the database
+        Apply unapplied migrations to the database, optionally only those in
+        the expand phase (see ``migrations_to_apply``).
+
+        Repeatable migrations are all applied if any migrations are applied,
+        or if ``force_repeatable``. Otherwise only those that changed since
+        they were last applied are, along with all post-apply migrations if
+        any pre-apply migrations were. Unless ``force_repeatable``, post-apply
+        migrations that declare the objects they define only run if those
+        objects are affected by the applied migrations (see
+        ``post_apply_migrations_to_run``).
+
+        If a snapshot directory is configured and every migration is being
+        applied to a fresh database, a cached snapshot is restored instead if
+        there's one for the current migrations (see ``restore_snapshot``), and
+        otherwise one is saved once they're applied.
         """
         await self.validate_applied_migrations()
 
-        migrations_to_apply = self.migrations_to_apply(n=n)
+        applying_all_to_fresh_database = (
+            self.fresh_database
+            and not self.applied_migrations
+            and n is None
+            and phase != EXPAND_PHASE
+            and self.config.snapshot_directory is not None
+        )
+        if applying_all_to_fresh_database and await self.restore_snapshot():
+            return
+
+        if not ignore_lock_impact_threshold:
+            await self.check_lock_impact(n=n, phase=phase)
+
+        migrations_to_apply = self.migrations_to_apply(n=n, phase=phase)
 
-        await self._apply_pre_apply_migrations()
+        apply_all_repeatable = force_repeatable or bool(migrations_to_apply)
+        pre_applied = await self._apply_pre_apply_migrations(
+            run_all=apply_all_repeatable
+        )
+        if pre_applied:
+            apply_all_repeatable = True
+        contents = (
+            None
+            if force_repeatable
+            else [m.up for m in pre_applied] + [m.up for m in migrations_to_apply]
+        )
 
         migration: Migration | None = None
         try:
             for migration in migrations_to_apply:
                 if migration.id in {m.id for m in self.applied_migrations}:
                     continue
-                async with self.backend.transaction():
-                    await self.backend.apply_migration(migration.up)
-                    await self.backend.register_migration(migration)
+                await self._apply_migration(migration)
         except Exception as e:
             raise MigrationApplyError(
                 f"Failed to apply migration {migration.id if migration else ''}"
             ) from e
         finally:
-            async with self.backend.transaction():
-                await self._apply_post_apply_migrations()
+            await self._apply_post_apply_migrations(
+                run_all=apply_all_repeatable, contents=contents
+            )
+
+        try:
+            await self.backend.analyze_migrated_tables(migrations_to_apply)
+        except NotImplementedError:
+            pass
 
         self.applied_migrations = await self.backend.get_applied_migrations()
 
+        if applying_all_to_fresh_database:
+            await self.save_snapshot()
+
+    async def squash_migrations(self, until: str) -> Migration:
+        """
+        Create a baseline migration that replaces the migrations up to and
+        including ``until``, from a dump of the schema they create.
+
+        The migrations are applied, without repeatable migrations or
+        registering them, to this runner's database, which must be a scratch
+        database without any applied migrations.
+        """
+        if self.applied_migrations:
+            raise MigrationSquashError(
+                "Migrations can only be squashed using an empty scratch database"
+            )
+
+        migrations = [m for m in self.migrations if m.id <= until]
+        if not migrations or migrations[-1].id != until:
+            raise MigrationSquashError(f"There is no migration {until} to squash to")
+
+        migration: Migration | None = None
+        try:
+            for migration in migrations:
+                await self._apply_migration(migration, register=False)
+        except Exception as e:
+            raise MigrationApplyError(
+                f"Failed to apply migration {migration.id if migration else ''}"
+            ) from e
+
+        schema = await self.backend.dump_schema()
+
+        squashed: dict[str, str] = {}
+        for migration in migrations:
+            squashed.update(migration.squashed or {migration.id: migration.up_hash})
+        return parse_baseline_migration(
+            migration_id=until, content=format_baseline_migration(squashed, schema)
+        )
+
     def migrations_to_rollback(self, n: int | None = None) -> list[Migration]:
         if n == 0:
             return []
@@ -178,10 +758,13 @@ class FluxRunner:
         self,
         n: int | None = None,
         apply_repeatable: bool | None = None,
+        force_repeatable: bool = False,
     ):
         """
         Rollback applied migrations from the database, applying any undo
         migrations if they exist.
+
+        Repeatable migrations are applied as in ``apply_migrations``.
         """
         await self.validate_applied_migrations()
 
@@ -191,26 +774,45 @@ class FluxRunner:
             else self.config.apply_repeatable_on_down
         )
 
-        if should_apply_repeatable:
-            await self._apply_pre_apply_migrations()
-
         migrations_to_rollback = self.migrations_to_rollback(n=n)
 
+        apply_all_repeatable = force_repeatable or bool(migrations_to_rollback)
+        pre_applied: list[Migration] = []
+        if should_apply_repeatable:
+            pre_applied = await self._apply_pre_apply_migrations(
+                run_all=apply_all_repeatable
+            )
+            if pre_applied:
+                apply_all_repeatable = True
+        contents = (
+            None
+            if force_repeatable
+            else [m.up for m in pre_applied]
+            + [m.down for m in migrations_to_rollback if m.down is not None]
+        )
+
         migration: Migration | None = None
         try:
             for migration in migrations_to_rollback:
                 async with self.backend.transaction():
                     if migration.down is not None:
-                        await self.backend.apply_migration(migration.down)
+                        async with self.backend.session_settings(migration.settings):
+                            await self.backend.apply_migration(migration.down)
                     await self.backend.unregister_migration(migration)
+                    for squashed_id in migration.squashed:
+                        if squashed_id != migration.id:
+                            await self.backend.unregister_migration(
+                                Migration(id=squashed_id, up="", down=None)
+                            )
         except Exception as e:
             raise MigrationApplyError(
                 f"Failed to rollback migration {migration.id if migration else ''}"
             ) from e
         finally:
             if should_apply_repeatable:
-                async with self.backend.transaction():
-                    await self._apply_post_apply_migrations()
+                await self._apply_post_apply_migrations(
+                    run_all=apply_all_repeatable, contents=contents
+                )
 
         self.applied_migrations = await self.backend.get_applied_migrations()
 
@@ -218,6 +820,7 @@ class FluxRunner:
         self,
         migration_id: str,
         apply_repeatable: bool | None = None,
+        force_repeatable: bool = False,
     ):
         """
         Rollback all migrations up to and including the given migration ID
@@ -236,4 +839,6 @@ class FluxRunner:
 
         n = len(applied_migrations) - target_migration_index
 
-        await self.rollback_migrations(n=n, apply_repeatable=apply_repeatable)
+        await self.rollback_migrations(
+            n=n, apply_repeatable=apply_repeatable, force_repeatable=force_repeatable
+        )
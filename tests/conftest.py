@@ -6,6 +6,8 @@ import pytest
 from flux.backend.get_backends import __name__ as GET_BACKENDS_NAME
 from flux.constants import FLUX_BACKEND_PLUGIN_GROUP
 
+pytest_plugins = ["pytester"]
+
 
 @pytest.fixture
 def mock_installed_in_memory_backend():
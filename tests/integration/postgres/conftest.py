@@ -3,7 +3,7 @@ import random
 import shutil
 from string import ascii_lowercase
 from tempfile import TemporaryDirectory
-from typing import AsyncGenerator, Generator
+from typing import AsyncGenerator, Awaitable, Callable, Generator
 
 import pytest
 from databases import Database
@@ -32,6 +32,49 @@ def database_uri(test_database) -> str:
     return f"{TEST_PG_CONNECTION_STRING}/{test_database}"
 
 
+@pytest.fixture
+async def create_database_uri() -> AsyncGenerator[Callable[[], Awaitable[str]], None]:
+    """
+    Create further empty databases on demand, e.g. scratch databases
+    """
+    test_db_names: list[str] = []
+    async with Database(f"{TEST_PG_CONNECTION_STRING}/{TEST_PG_MANAGEMENT_DB}") as db:
+
+        async def create() -> str:
+            test_db_name = "test_" + "".join(random.choices(ascii_lowercase, k=10))
+            await db.execute(f"create database {test_db_name}")
+            test_db_names.append(test_db_name)
+            return f"{TEST_PG_CONNECTION_STRING}/{test_db_name}"
+
+        try:
+            yield create
+        finally:
+            for test_db_name in test_db_names:
+                await db.execute(f"drop database {test_db_name}")
+
+
+@pytest.fixture
+async def template_database_uri() -> AsyncGenerator[str, None]:
+    """
+    The URI of a template database that doesn't exist yet, which is dropped
+    afterwards along with any clones of it
+    """
+    template_db_name = "test_" + "".join(random.choices(ascii_lowercase, k=10))
+    try:
+        yield f"{TEST_PG_CONNECTION_STRING}/{template_db_name}"
+    finally:
+        async with Database(
+            f"{TEST_PG_CONNECTION_STRING}/{TEST_PG_MANAGEMENT_DB}"
+        ) as db:
+            rows = await db.fetch_all(
+                "select datname from pg_database where datname like :pattern",
+                {"pattern": f"{template_db_name}%"},
+            )
+            for row in rows:
+                await db.execute(f"alter database {row[0]} is_template false")
+                await db.execute(f"drop database {row[0]} with (force)")
+
+
 @pytest.fixture
 async def postgres_backend(database_uri: str):
     return FluxPostgresBackend(
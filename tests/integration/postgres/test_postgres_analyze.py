@@ -0,0 +1,66 @@
+import dataclasses
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+
+async def _analyzed_tables(postgres_backend: FluxPostgresBackend) -> set[str]:
+    async with postgres_backend.connection():
+        rows = await postgres_backend._conn.fetch_all(
+            "select relname from pg_stat_user_tables where last_analyze is not null"
+        )
+    return {row[0] for row in rows}
+
+
+@pytest.mark.parametrize("analyze_parallelism", [1, 4])
+async def test_postgres_analyze_after_apply(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+    analyze_parallelism: int,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+    backend = dataclasses.replace(
+        postgres_backend, analyze_parallelism=analyze_parallelism
+    )
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        await runner.apply_migrations()
+
+    assert await _analyzed_tables(postgres_backend) == {
+        "simple_table",
+        "another_table",
+        "new_table",
+    }
+
+
+async def test_postgres_analyze_after_apply_only_touched_tables(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations(n=1)
+
+    assert await _analyzed_tables(postgres_backend) == {"simple_table"}
+
+
+async def test_postgres_analyze_after_apply_disabled(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    config = postgres_config(
+        migration_directory=example_migrations_dir,
+        backend_config={"analyze_after_apply": False},
+    )
+    backend = FluxPostgresBackend.from_config(config, database_uri)
+    assert backend.analyze_after_apply is False
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        await runner.apply_migrations()
+
+    assert await _analyzed_tables(postgres_backend) == set()
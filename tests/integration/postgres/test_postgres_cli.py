@@ -1,3 +1,4 @@
+import json
 import os
 
 import pytest
@@ -599,3 +600,39 @@ async def test_cli_status_report(
 └──────────────────────────────────────────────┴─────────────┘
 """  # noqa: W291
         )
+
+
+async def test_cli_lint(
+    example_project_dir: str,
+    example_migrations_dir: str,
+):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["lint"])
+        assert result.exit_code == 0, result.stdout
+        assert json.loads(result.stdout) == []
+
+        with open(
+            os.path.join(example_migrations_dir, "20200103_001_index_new_table.sql"),
+            "w",
+        ) as f:
+            f.write("create index new_table_info_idx on new_table (info);")
+
+        result = runner.invoke(app, ["lint"])
+        assert result.exit_code == 1, result.stdout
+        assert json.loads(result.stdout) == [
+            {
+                "migration_id": "20200103_001_index_new_table",
+                "statement_index": 0,
+                "statement": "create index new_table_info_idx on new_table (info);",
+                "rule": "create-index-not-concurrently",
+                "message": "Creating an index without 'concurrently' blocks writes to the table while the index is built",  # noqa: E501
+            }
+        ]
+
+        result = runner.invoke(app, ["lint", "--since", "20200103_001_index_new_table"])
+        assert result.exit_code == 0, result.stdout
+        assert json.loads(result.stdout) == []
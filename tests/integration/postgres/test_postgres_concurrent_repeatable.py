@@ -0,0 +1,117 @@
+import dataclasses
+import os
+import time
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.exceptions import MigrationApplyError
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+
+def _write_post_apply_migration(
+    migrations_dir: str, migration_id: str, group: str, content: str
+):
+    with open(
+        os.path.join(migrations_dir, "post-apply", f"{migration_id}.sql"), "w"
+    ) as f:
+        f.write(f"-- flux:group {group}\n{content}\n")
+
+
+def _write_grouped_migrations(migrations_dir: str, failing_groups: set[str]):
+    for group in ["a", "b", "c"]:
+        for step in range(2):
+            content = (
+                "select pg_sleep(0.3);"
+                f"insert into post_apply_runs values ('{group}{step}', "
+                "pg_backend_pid());"
+            )
+            if step == 1 and group in failing_groups:
+                content = "select * from missing_table;"
+            _write_post_apply_migration(
+                migrations_dir, f"20200102_00{step}_group_{group}", group, content
+            )
+
+
+@pytest.fixture
+def post_apply_runs_migrations_dir(example_migrations_dir: str) -> str:
+    with open(
+        os.path.join(
+            example_migrations_dir, "pre-apply", "20200101_003_post_apply_runs.sql"
+        ),
+        "w",
+    ) as f:
+        f.write("create table if not exists post_apply_runs (id text, pid int);")
+    return example_migrations_dir
+
+
+async def _post_apply_runs(postgres_backend: FluxPostgresBackend) -> dict[str, int]:
+    rows = await postgres_backend._conn.fetch_all("select id, pid from post_apply_runs")
+    return {row[0]: row[1] for row in rows}
+
+
+async def test_postgres_grouped_repeatable_migrations_run_concurrently(
+    postgres_backend: FluxPostgresBackend,
+    post_apply_runs_migrations_dir: str,
+):
+    _write_grouped_migrations(post_apply_runs_migrations_dir, failing_groups=set())
+    config = postgres_config(migration_directory=post_apply_runs_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        started = time.monotonic()
+        await runner.apply_migrations()
+        elapsed = time.monotonic() - started
+
+        runs = await _post_apply_runs(postgres_backend)
+        assert set(runs) == {"a0", "a1", "b0", "b1", "c0", "c1"}
+        assert len(set(runs.values())) == 3
+        assert runs["a0"] == runs["a1"]
+        assert elapsed < 1.5
+
+        view_count = await postgres_backend._conn.fetch_val(
+            "select count(*) from information_schema.views "
+            "where table_name in ('view1', 'view2')"
+        )
+        assert view_count == 2
+
+
+async def test_postgres_grouped_repeatable_migrations_failures(
+    postgres_backend: FluxPostgresBackend,
+    post_apply_runs_migrations_dir: str,
+):
+    _write_grouped_migrations(post_apply_runs_migrations_dir, failing_groups={"a", "c"})
+    config = postgres_config(migration_directory=post_apply_runs_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        with pytest.raises(MigrationApplyError) as exc_info:
+            await runner.apply_migrations()
+
+        assert str(exc_info.value) == (
+            "Failed to apply post-apply migration 20200102_001_group_a "
+            "(also failed: 20200102_001_group_c)"
+        )
+        assert set(await _post_apply_runs(postgres_backend)) == {
+            "a0",
+            "b0",
+            "b1",
+            "c0",
+        }
+
+
+async def test_postgres_grouped_repeatable_migrations_without_parallelism(
+    postgres_backend: FluxPostgresBackend,
+    post_apply_runs_migrations_dir: str,
+):
+    _write_grouped_migrations(post_apply_runs_migrations_dir, failing_groups={"c"})
+    config = postgres_config(migration_directory=post_apply_runs_migrations_dir)
+    backend = dataclasses.replace(postgres_backend, repeatable_parallelism=1)
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        with pytest.raises(MigrationApplyError) as exc_info:
+            await runner.apply_migrations()
+
+        assert str(exc_info.value) == (
+            "Failed to apply post-apply migration 20200102_001_group_c"
+        )
+        assert await _post_apply_runs(backend) == {}
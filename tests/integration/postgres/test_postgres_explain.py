@@ -0,0 +1,86 @@
+import os
+
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.cli import app
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.helpers import postgres_config
+
+NEW_MIGRATION_ID = "20200103_001_add_rows_to_simple_table"
+
+
+def _write_new_dml_migration(migrations_dir: str):
+    with open(os.path.join(migrations_dir, f"{NEW_MIGRATION_ID}.sql"), "w") as f:
+        f.write(
+            """
+            alter table simple_table add column extra text;
+            insert into simple_table (data) values ('a'), ('b');
+            update simple_table set data = 'c' where id = 1;
+            select * from table_that_does_not_exist;
+            """
+        )
+
+
+async def test_postgres_explain_migrations(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    _write_new_dml_migration(example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        explanations = await runner.explain_migrations()
+
+        assert list(explanations.keys()) == [NEW_MIGRATION_ID]
+        alter, insert, update, select = explanations[NEW_MIGRATION_ID]
+
+        assert alter.statement.startswith("alter table simple_table")
+        assert not alter.explained
+        assert alter.skipped_reason == "Not explainable"
+
+        assert insert.explained
+        assert insert.estimated_rows == 2
+        assert insert.estimated_cost is not None
+
+        assert update.explained
+        assert update.estimated_cost is not None
+
+        assert not select.explained
+        assert select.skipped_reason is not None
+        assert select.skipped_reason.startswith("Could not explain")
+
+        # Nothing was applied while explaining
+        assert await postgres_backend.table_info("simple_table") == [
+            ("id", "integer"),
+            ("data", "text"),
+            ("description", "text"),
+        ]
+        assert runner.list_unapplied_migrations()[0].id == NEW_MIGRATION_ID
+
+
+async def test_cli_apply_explain(
+    example_project_dir: str,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 0, result.stdout
+
+        _write_new_dml_migration(example_migrations_dir)
+
+        result = runner.invoke(app, ["apply", "--explain", database_uri], input="n\n")
+        assert result.exit_code == 1, result.stdout
+        assert "Explain" in result.stdout
+        assert "Est. Cost" in result.stdout
+        assert "Not explainable" in result.stdout
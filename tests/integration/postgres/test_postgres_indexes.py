@@ -0,0 +1,140 @@
+import dataclasses
+import os
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.exceptions import MigrationApplyError
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+INDEX_MIGRATION_ID = "20200103_001_add_indexes"
+
+
+def _write_index_migration(migrations_dir: str, indexes: list[str]):
+    with open(os.path.join(migrations_dir, f"{INDEX_MIGRATION_ID}.py"), "w") as f:
+        f.write(
+            f"""
+settings = {{"maintenance_work_mem": "128MB"}}
+
+
+def indexes():
+    return {indexes!r}
+"""
+        )
+
+
+async def _index_validity(postgres_backend: FluxPostgresBackend) -> dict[str, bool]:
+    rows = await postgres_backend._conn.fetch_all(
+        "select c.relname, i.indisvalid from pg_index i "
+        "join pg_class c on c.oid = i.indexrelid "
+        "where c.relname like '%\\_idx'"
+    )
+    return {row[0]: row[1] for row in rows}
+
+
+async def test_postgres_index_migration(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    _write_index_migration(
+        example_migrations_dir,
+        [
+            "create index simple_table_data_idx on simple_table (data);",
+            "create index simple_table_id_data_idx on simple_table (id, data);",
+            "create index another_table_value_idx on another_table (value);",
+            "create index new_table_info_idx on new_table (info);",
+        ],
+    )
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        assert INDEX_MIGRATION_ID in {m.id for m in runner.applied_migrations}
+        assert await _index_validity(postgres_backend) == {
+            "simple_table_data_idx": True,
+            "simple_table_id_data_idx": True,
+            "another_table_value_idx": True,
+            "new_table_info_idx": True,
+        }
+
+
+async def test_postgres_index_migration_rebuilds_invalid_index(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        # Leave an invalid index behind from a failed concurrent build
+        await postgres_backend._conn.execute(
+            "insert into simple_table (data) values ('a'), ('a')"
+        )
+        with pytest.raises(Exception):
+            await postgres_backend._conn.execute(
+                "create unique index concurrently simple_table_data_idx "
+                "on simple_table (data)"
+            )
+        assert await _index_validity(postgres_backend) == {
+            "simple_table_data_idx": False
+        }
+        await postgres_backend._conn.execute(
+            "delete from simple_table where id = (select max(id) from simple_table)"
+        )
+
+    _write_index_migration(
+        example_migrations_dir,
+        [
+            "create unique index simple_table_data_idx on simple_table (data);",
+        ],
+    )
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        assert await _index_validity(postgres_backend) == {
+            "simple_table_data_idx": True
+        }
+
+
+async def test_postgres_index_migration_fails(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+    backend = dataclasses.replace(postgres_backend, index_build_attempts=2)
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        await runner.apply_migrations()
+        await backend._conn.execute(
+            "insert into simple_table (data) values ('a'), ('a')"
+        )
+
+    _write_index_migration(
+        example_migrations_dir,
+        [
+            "create unique index simple_table_data_idx on simple_table (data);",
+            "create index another_table_value_idx on another_table (value);",
+        ],
+    )
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        with pytest.raises(MigrationApplyError):
+            await runner.apply_migrations()
+
+        assert INDEX_MIGRATION_ID not in {m.id for m in runner.applied_migrations}
+        # The invalid index is cleaned up, and other indexes are still built
+        assert await _index_validity(backend) == {"another_table_value_idx": True}
+
+
+async def test_postgres_index_migration_invalid_definition(
+    postgres_backend: FluxPostgresBackend,
+):
+    async with postgres_backend.connection():
+        with pytest.raises(ValueError):
+            await postgres_backend.build_indexes(
+                ["create index on simple_table (data)"]
+            )
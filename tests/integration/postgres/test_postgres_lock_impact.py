@@ -0,0 +1,134 @@
+import dataclasses
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.cli import app
+from flux.exceptions import LockImpactThresholdExceededError
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.helpers import postgres_config
+
+NEW_MIGRATION_ID = "20200103_001_rewrite_simple_table"
+
+
+def _write_new_rewrite_migration(migrations_dir: str):
+    with open(os.path.join(migrations_dir, f"{NEW_MIGRATION_ID}.sql"), "w") as f:
+        f.write(
+            """
+            create table unrelated_table (id serial primary key);
+            alter table simple_table alter column data type varchar(100);
+            alter table simple_table add column note text;
+            """
+        )
+
+
+async def _fill_simple_table(postgres_backend: FluxPostgresBackend):
+    async with postgres_backend.connection():
+        await postgres_backend.apply_migration(
+            """
+            insert into simple_table (data)
+            select md5(i::text) from generate_series(1, 1000) as i;
+            analyze simple_table;
+            """
+        )
+
+
+async def test_postgres_estimate_lock_impact(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    await _fill_simple_table(postgres_backend)
+    _write_new_rewrite_migration(example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        lock_impacts = await runner.estimate_lock_impact()
+
+        assert list(lock_impacts.keys()) == [NEW_MIGRATION_ID]
+        alter_type, add_column = lock_impacts[NEW_MIGRATION_ID]
+
+        assert alter_type.table == "simple_table"
+        assert alter_type.lock_mode == "ACCESS EXCLUSIVE"
+        assert alter_type.blocks_writes is True
+        assert alter_type.rewrites is True
+        assert alter_type.estimated_rows == 1000
+        assert alter_type.estimated_pages is not None
+        assert alter_type.estimated_pages > 0
+        assert alter_type.estimated_bytes is not None
+        assert alter_type.estimated_bytes > 0
+
+        assert add_column.rewrites is False
+        assert add_column.scans is False
+        assert add_column.estimated_bytes == 0
+
+        # No threshold is configured
+        assert runner.lock_impacts_over_threshold(lock_impacts) == {}
+
+
+async def test_postgres_lock_impact_threshold_blocks_apply(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    await _fill_simple_table(postgres_backend)
+    _write_new_rewrite_migration(example_migrations_dir)
+
+    config = dataclasses.replace(config, lock_impact_threshold_bytes=1)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        with pytest.raises(LockImpactThresholdExceededError):
+            await runner.apply_migrations()
+
+        assert NEW_MIGRATION_ID not in {m.id for m in runner.applied_migrations}
+
+        await runner.apply_migrations(ignore_lock_impact_threshold=True)
+
+        assert NEW_MIGRATION_ID in {m.id for m in runner.applied_migrations}
+
+
+async def test_cli_apply_lock_impact_threshold(
+    example_project_dir: str,
+    example_migrations_dir: str,
+    postgres_backend: FluxPostgresBackend,
+    database_uri: str,
+):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 0, result.stdout
+
+        await _fill_simple_table(postgres_backend)
+        _write_new_rewrite_migration(example_migrations_dir)
+
+        with open("flux.toml", "r") as f:
+            config = f.read()
+        with open("flux.toml", "w") as f:
+            f.write(
+                config.replace(
+                    "[backend]", "lock_impact_threshold_bytes = 1\n\n[backend]"
+                )
+            )
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 1, result.stdout
+        assert "Lock Impact" in result.stdout
+        assert "exceed the lock impact threshold" in result.stdout
+
+        result = runner.invoke(
+            app, ["apply", "--auto-approve", "--allow-lock-impact", database_uri]
+        )
+        assert result.exit_code == 0, result.stdout
@@ -0,0 +1,157 @@
+import asyncio
+import dataclasses
+import logging
+from contextlib import asynccontextmanager
+
+import pytest
+from databases import Database
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import DEFAULT_MIGRATIONS_LOCK_ID, FluxPostgresBackend
+from flux.cli import app
+from flux.exceptions import MigrationLockTimeoutError
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.helpers import postgres_config
+
+
+@asynccontextmanager
+async def _holding_migration_lock(database_uri: str):
+    async with Database(database_uri) as db:
+        async with db.connection() as conn:
+            await conn.execute(
+                "select pg_advisory_lock(:lock_id)",
+                {"lock_id": DEFAULT_MIGRATIONS_LOCK_ID},
+            )
+            await conn.execute("set application_name = 'lock-holder'")
+            yield await conn.fetch_val("select pg_backend_pid()")
+
+
+async def test_postgres_migration_lock_timeout(
+    postgres_backend: FluxPostgresBackend,
+    database_uri: str,
+):
+    backend = dataclasses.replace(
+        postgres_backend,
+        migrations_lock_timeout=0.2,
+        lock_poll_interval=0.05,
+    )
+
+    async with _holding_migration_lock(database_uri) as holder_pid:
+        with pytest.raises(MigrationLockTimeoutError) as exc_info:
+            async with backend.connection():
+                async with backend.migration_lock():
+                    pass
+
+    assert [blocker.pid for blocker in exc_info.value.blockers] == [holder_pid]
+    assert exc_info.value.blockers[0].application_name == "lock-holder"
+    assert "lock-holder" in str(exc_info.value)
+
+
+async def test_postgres_migration_lock_waits_for_release(
+    postgres_backend: FluxPostgresBackend,
+    database_uri: str,
+    caplog: pytest.LogCaptureFixture,
+):
+    backend = dataclasses.replace(
+        postgres_backend,
+        lock_poll_interval=0.05,
+        lock_wait_report_interval=0.1,
+    )
+    acquired = asyncio.Event()
+
+    async def acquire():
+        async with backend.connection():
+            async with backend.migration_lock():
+                acquired.set()
+
+    with caplog.at_level(logging.WARNING, logger="flux"):
+        async with _holding_migration_lock(database_uri):
+            task = asyncio.create_task(acquire())
+            await asyncio.sleep(0.4)
+            assert not acquired.is_set()
+        await asyncio.wait_for(task, timeout=5)
+
+    assert acquired.is_set()
+    assert "Waiting" in caplog.text
+    assert "lock-holder" in caplog.text
+
+
+async def test_postgres_statement_lock_wait_is_reported(
+    postgres_backend: FluxPostgresBackend,
+    database_uri: str,
+    caplog: pytest.LogCaptureFixture,
+):
+    backend = dataclasses.replace(postgres_backend, lock_wait_report_interval=0.1)
+
+    async with backend.connection():
+        await backend.apply_migration("create table locked_table (id int);")
+
+    with caplog.at_level(logging.WARNING, logger="flux"):
+        async with Database(database_uri) as db:
+            async with db.connection() as conn:
+                await conn.execute("set application_name = 'table-locker'")
+                transaction = await conn.transaction().start()
+                await conn.execute("lock table locked_table")
+
+                async with backend.connection():
+                    task = asyncio.create_task(
+                        backend.apply_migration("insert into locked_table values (1);")
+                    )
+                    await asyncio.sleep(0.5)
+                    assert not task.done()
+
+                    await transaction.rollback()
+                    await asyncio.wait_for(task, timeout=5)
+
+    assert "waiting for a lock" in caplog.text
+    assert "table-locker" in caplog.text
+
+
+async def test_cli_migration_lock_timeout(
+    example_project_dir: str,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        with open("flux.toml") as f:
+            config = f.read()
+        with open("flux.toml", "w") as f:
+            f.write(
+                config.replace(
+                    "[backend]\n",
+                    "[backend]\n"
+                    "migrations_lock_timeout = 0.2\n"
+                    "lock_poll_interval = 0.05\n",
+                )
+            )
+
+        async with _holding_migration_lock(database_uri) as holder_pid:
+            result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+
+        assert result.exit_code == 1, result.stdout
+        assert "Timed out waiting for the migration lock" in result.stdout
+        assert "Lock Holders" in result.stdout
+        assert str(holder_pid) in result.stdout
+
+
+async def test_runner_migration_lock_timeout(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    config = postgres_config(
+        migration_directory=example_migrations_dir,
+        backend_config={"migrations_lock_timeout": 0.1},
+    )
+    backend = FluxPostgresBackend.from_config(config, database_uri)
+    assert backend.migrations_lock_timeout == 0.1
+
+    async with _holding_migration_lock(database_uri):
+        with pytest.raises(MigrationLockTimeoutError):
+            async with FluxRunner(config=config, backend=backend):
+                pass
@@ -0,0 +1,151 @@
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.cli import app
+from flux.exceptions import MigrationDirectoryCorruptedError
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.helpers import postgres_config
+
+EXPAND_1 = "20200103_001_add_email_column"
+CONTRACT_1 = "20200103_002_drop_description_column"
+EXPAND_2 = "20200103_003_add_note_column"
+UNTAGGED = "20200103_004_add_kind_column"
+EXPAND_3 = "20200103_005_add_flag_column"
+
+
+def _write_phase_migrations(migrations_dir: str):
+    def write(filename: str, content: str):
+        with open(os.path.join(migrations_dir, filename), "w") as f:
+            f.write(content)
+
+    write(
+        f"{EXPAND_1}.sql",
+        "-- flux:phase expand\nalter table simple_table add column email text;",
+    )
+    write(
+        f"{CONTRACT_1}.py",
+        'phase = "contract"\n\n\n'
+        "def apply():\n"
+        '    return "alter table simple_table drop column description;"\n',
+    )
+    write(
+        f"{EXPAND_2}.sql",
+        "-- flux:phase expand\nalter table simple_table add column note text;",
+    )
+    write(f"{UNTAGGED}.sql", "alter table simple_table add column kind text;")
+    write(
+        f"{EXPAND_3}.sql",
+        "-- flux:phase expand\nalter table simple_table add column flag bool;",
+    )
+
+
+async def test_postgres_migrations_apply_expand_phase(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    _write_phase_migrations(example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        assert [m.id for m in runner.migrations_to_apply(phase="expand")] == [
+            EXPAND_1,
+            EXPAND_2,
+        ]
+
+        await runner.apply_migrations(phase="expand")
+
+        applied_ids = {m.id for m in runner.applied_migrations}
+        assert {EXPAND_1, EXPAND_2} <= applied_ids
+        assert not {CONTRACT_1, UNTAGGED, EXPAND_3} & applied_ids
+
+        columns = {c for c, _ in await postgres_backend.table_info("simple_table")}
+        assert {"description", "email", "note"} <= columns
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        # The skipped contract migration is tolerated
+        await runner.validate_applied_migrations()
+
+        assert [m.id for m in runner.migrations_to_apply()] == [
+            CONTRACT_1,
+            UNTAGGED,
+            EXPAND_3,
+        ]
+        await runner.apply_migrations(phase="contract")
+
+        assert runner.list_unapplied_migrations() == []
+        columns = {c for c, _ in await postgres_backend.table_info("simple_table")}
+        assert "description" not in columns
+        assert {"email", "note", "kind", "flag"} <= columns
+
+
+async def test_postgres_migrations_expand_phase_gap_must_be_contract(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    _write_phase_migrations(example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations(phase="expand")
+
+    # The skipped migration is no longer tagged with the contract phase
+    with open(os.path.join(example_migrations_dir, f"{CONTRACT_1}.py"), "w") as f:
+        f.write(
+            "def apply():\n"
+            '    return "alter table simple_table drop column description;"\n'
+        )
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        with pytest.raises(MigrationDirectoryCorruptedError):
+            await runner.validate_applied_migrations()
+
+
+async def test_cli_apply_expand_phase(
+    example_project_dir: str,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 0, result.stdout
+
+        _write_phase_migrations(example_migrations_dir)
+
+        result = runner.invoke(
+            app, ["apply", "--auto-approve", "--phase", "expand", database_uri]
+        )
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["status", database_uri])
+        assert result.exit_code == 0, result.stdout
+        statuses = {
+            line.split("│")[1].strip(): line.split("│")[2].strip()
+            for line in result.stdout.splitlines()
+            if line.count("│") == 3
+        }
+        assert statuses[EXPAND_1] == "Applied"
+        assert statuses[EXPAND_2] == "Applied"
+        assert statuses[CONTRACT_1] == "Not Applied"
+        assert statuses[EXPAND_3] == "Not Applied"
+
+        result = runner.invoke(
+            app, ["apply", "--auto-approve", "--phase", "deploy", database_uri]
+        )
+        assert result.exit_code == 1, result.stdout
+        assert "Phase must be one of expand, contract" in result.stdout
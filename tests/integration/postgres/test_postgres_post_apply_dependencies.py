@@ -0,0 +1,161 @@
+import os
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+
+@pytest.fixture
+def dependency_migrations_dir(example_migrations_dir: str) -> str:
+    """
+    Example migrations whose post-apply migrations declare the objects they
+    define, without a pre-apply migration that drops them all
+    """
+    os.remove(
+        os.path.join(
+            example_migrations_dir, "pre-apply", "20200101_001_drop_all_views.sql"
+        )
+    )
+
+    post_apply_dir = os.path.join(example_migrations_dir, "post-apply")
+    view1_file = os.path.join(post_apply_dir, "20200101_001_recreate_view1.sql")
+    with open(view1_file) as f:
+        view1 = f.read()
+    with open(view1_file, "w") as f:
+        f.write(f"-- flux:defines view1\n{view1}")
+
+    view2_file = os.path.join(post_apply_dir, "20200101_002_recreate_view2.py")
+    with open(view2_file) as f:
+        view2 = f.read()
+    with open(view2_file, "w") as f:
+        f.write(f'defines = ["view2"]\n\n\n{view2}')
+
+    with open(os.path.join(post_apply_dir, "20200101_003_create_view3.sql"), "w") as f:
+        f.write(
+            "-- flux:defines view3\n"
+            "create or replace view view3 as select id from view1;\n"
+        )
+    with open(
+        os.path.join(post_apply_dir, "20200101_004_create_view3_count.sql"), "w"
+    ) as f:
+        f.write(
+            "-- flux:defines view3_count\n"
+            "create or replace function view3_count() returns bigint\n"
+            "language sql begin atomic select count(*) from view3; end;\n"
+        )
+
+    return example_migrations_dir
+
+
+async def test_postgres_dependent_objects(
+    postgres_backend: FluxPostgresBackend,
+    dependency_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=dependency_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        assert await postgres_backend.existing_objects(
+            ["view1", "public.view2", "view3_count", "missing_view"]
+        ) == {"view1", "public.view2", "view3_count"}
+
+        assert await postgres_backend.dependent_objects(
+            ["alter table simple_table add column extra text;"],
+            [],
+            ["view1", "view2", "view3", "view3_count"],
+        ) == {"view1": 1, "view3": 2, "view3_count": 3}
+
+        assert await postgres_backend.dependent_objects(
+            [], ["view3"], ["view1", "view2", "view3", "view3_count"]
+        ) == {"view3_count": 1}
+
+
+async def test_postgres_post_apply_only_affected_objects(
+    postgres_backend: FluxPostgresBackend,
+    dependency_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=dependency_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        assert [
+            m.id
+            for m in await runner.post_apply_migrations_to_run(
+                contents=["alter table simple_table add column extra text;"]
+            )
+        ] == [
+            "20200101_001_recreate_view1",
+            "20200101_003_create_view3",
+            "20200101_004_create_view3_count",
+        ]
+        assert [
+            m.id
+            for m in await runner.post_apply_migrations_to_run(
+                contents=["alter table another_table add column extra text;"]
+            )
+        ] == ["20200101_002_recreate_view2"]
+        assert await runner.post_apply_migrations_to_run(contents=[]) == []
+        assert len(await runner.post_apply_migrations_to_run()) == 4
+
+        await postgres_backend._conn.execute("drop view view2")
+        assert [
+            m.id for m in await runner.post_apply_migrations_to_run(contents=[])
+        ] == ["20200101_002_recreate_view2"]
+
+        await runner.apply_migrations(force_repeatable=False)
+        assert await postgres_backend.existing_objects(["view2"]) == {"view2"}
+
+
+async def test_postgres_post_apply_changed_object_reruns_dependents(
+    postgres_backend: FluxPostgresBackend,
+    dependency_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=dependency_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    with open(
+        os.path.join(
+            dependency_migrations_dir, "post-apply", "20200101_003_create_view3.sql"
+        ),
+        "a",
+    ) as f:
+        f.write("-- changed\n")
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        assert [
+            m.id for m in await runner.post_apply_migrations_to_run(contents=[])
+        ] == ["20200101_003_create_view3", "20200101_004_create_view3_count"]
+
+
+async def test_postgres_post_apply_rollback_affected_objects(
+    postgres_backend: FluxPostgresBackend,
+    dependency_migrations_dir: str,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    config = postgres_config(migration_directory=dependency_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+        applied: list[str] = []
+        apply_repeatable_migrations = runner._apply_repeatable_migrations
+
+        async def record_repeatable_migrations(kind, migrations, *args, **kwargs):
+            applied.extend(f"{kind}/{m.id}" for m in migrations)
+            return await apply_repeatable_migrations(kind, migrations, *args, **kwargs)
+
+        monkeypatch.setattr(
+            runner, "_apply_repeatable_migrations", record_repeatable_migrations
+        )
+
+        await runner.rollback_migration("20200102_001_add_timestamp_to_another_table")
+
+    assert [m for m in applied if m.startswith("post-apply/")] == [
+        "post-apply/20200101_002_recreate_view2"
+    ]
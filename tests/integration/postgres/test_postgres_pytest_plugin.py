@@ -0,0 +1,77 @@
+from importlib.metadata import entry_points
+
+import pytest
+from databases import Database
+
+from tests.integration.postgres.constants import (
+    TEST_PG_CONNECTION_STRING,
+    TEST_PG_MANAGEMENT_DB,
+)
+
+PLUGIN_TESTS = """
+async def test_changes_are_rolled_back(flux_backend):
+    await flux_backend.apply_migration("create table scratch_table (id int)")
+
+
+async def test_isolated_from_other_tests(flux_backend):
+    assert await flux_backend._conn.fetch_val(
+        "select to_regclass('scratch_table') is null"
+    )
+    assert await flux_backend._conn.fetch_val(
+        "select count(*) from _flux_migrations"
+    ) == 3
+
+
+def test_databases_are_cloned(flux_database, flux_worker_database):
+    assert flux_database != flux_worker_database
+"""
+
+
+def _plugin_args() -> list[str]:
+    """
+    Load the plugin explicitly unless it's installed
+    """
+    if any(ep.value == "flux.pytest_plugin" for ep in entry_points(group="pytest11")):
+        return []
+    return ["-p", "flux.pytest_plugin"]
+
+
+async def _database_names(prefix: str) -> list[str]:
+    async with Database(f"{TEST_PG_CONNECTION_STRING}/{TEST_PG_MANAGEMENT_DB}") as db:
+        rows = await db.fetch_all(
+            "select datname from pg_database where datname like :pattern",
+            {"pattern": f"{prefix}%"},
+        )
+    return sorted(row[0] for row in rows)
+
+
+async def test_pytest_plugin(
+    pytester: pytest.Pytester,
+    example_migrations_dir: str,
+    template_database_uri: str,
+):
+    pytester.makefile(
+        ".toml",
+        flux=f"""
+[flux]
+backend = "postgres"
+migration_directory = "{example_migrations_dir}"
+
+[backend]
+maintenance_database = "{TEST_PG_MANAGEMENT_DB}"
+""",
+    )
+    pytester.makeini(
+        f"""
+[pytest]
+asyncio_mode = auto
+flux_template_database = {template_database_uri}
+"""
+    )
+    pytester.makepyfile(PLUGIN_TESTS)
+
+    result = pytester.runpytest_subprocess(*_plugin_args(), "-p", "no:cacheprovider")
+    result.assert_outcomes(passed=3)
+
+    template_name = template_database_uri.rsplit("/", 1)[1]
+    assert await _database_names(template_name) == [template_name]
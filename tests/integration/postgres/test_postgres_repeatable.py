@@ -0,0 +1,118 @@
+import os
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+COUNT_RUNS_ID = "20200101_003_count_runs"
+
+
+def _write_count_runs_migration(migrations_dir: str, comment: str = ""):
+    with open(
+        os.path.join(migrations_dir, "post-apply", f"{COUNT_RUNS_ID}.sql"), "w"
+    ) as f:
+        f.write(
+            f"""
+            {comment}
+            create table if not exists post_apply_runs (id serial primary key);
+            insert into post_apply_runs default values;
+            """
+        )
+
+
+async def _post_apply_runs(postgres_backend: FluxPostgresBackend) -> int:
+    return await postgres_backend._conn.fetch_val(
+        "select count(*) from post_apply_runs"
+    )
+
+
+async def test_postgres_repeatable_migrations_skipped_when_unchanged(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    _write_count_runs_migration(example_migrations_dir)
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 1
+
+        applied_post_apply = await postgres_backend.get_applied_repeatable_migrations(
+            "post-apply"
+        )
+        assert applied_post_apply == {
+            m.id: m.up_hash for m in runner.post_apply_migrations
+        }
+        assert set(
+            await postgres_backend.get_applied_repeatable_migrations("pre-apply")
+        ) == {m.id for m in runner.pre_apply_migrations}
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 1
+
+        await runner.apply_migrations(force_repeatable=True)
+        assert await _post_apply_runs(postgres_backend) == 2
+
+    _write_count_runs_migration(example_migrations_dir, comment="-- changed")
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 3
+
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 3
+
+        await runner.rollback_migrations(n=1)
+        assert await _post_apply_runs(postgres_backend) == 4
+
+
+async def test_postgres_repeatable_migrations_changed_pre_apply_reruns_post_apply(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    _write_count_runs_migration(example_migrations_dir)
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 1
+
+    with open(
+        os.path.join(
+            example_migrations_dir, "pre-apply", "20200101_001_drop_all_views.sql"
+        ),
+        "a",
+    ) as f:
+        f.write("\n-- changed\n")
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        assert await _post_apply_runs(postgres_backend) == 2
+
+        view_count = await postgres_backend._conn.fetch_val(
+            "select count(*) from information_schema.views "
+            "where table_name in ('view1', 'view2')"
+        )
+        assert view_count == 2
+
+
+async def test_postgres_repeatable_migrations_table_created_for_existing_database(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        await postgres_backend._conn.execute(
+            f"drop table {postgres_backend.qualified_repeatable_migrations_table}"
+        )
+        assert await postgres_backend.is_initialized() is False
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        assert await postgres_backend.is_initialized() is True
+        assert runner.list_unapplied_migrations() == []
+        assert (
+            await postgres_backend.get_applied_repeatable_migrations("post-apply") == {}
+        )
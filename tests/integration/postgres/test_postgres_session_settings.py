@@ -0,0 +1,75 @@
+import dataclasses
+import os
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+
+def _write_settings_migration(migrations_dir: str):
+    with open(
+        os.path.join(migrations_dir, "20200103_001_record_settings.sql"), "w"
+    ) as f:
+        f.write(
+            """
+            -- flux:set maintenance_work_mem = '123MB'
+            create table recorded_settings as
+            select
+                current_setting('maintenance_work_mem') as maintenance_work_mem,
+                current_setting('work_mem') as work_mem;
+            """
+        )
+
+
+async def test_postgres_migration_session_settings(
+    postgres_backend: FluxPostgresBackend,
+    example_migrations_dir: str,
+    database_uri: str,
+):
+    _write_settings_migration(example_migrations_dir)
+    config = postgres_config(
+        migration_directory=example_migrations_dir,
+        backend_config={
+            "session_settings": {"work_mem": "7MB", "maintenance_work_mem": "64MB"}
+        },
+    )
+    backend = FluxPostgresBackend.from_config(config, database_uri)
+
+    async with FluxRunner(config=config, backend=backend) as runner:
+        await runner.apply_migrations()
+
+        row = await backend._conn.fetch_one("select * from recorded_settings")
+        assert (row[0], row[1]) == ("123MB", "7MB")
+        # Settings only last until the end of each migration's transaction
+        assert await backend._conn.fetch_val("show work_mem") == "4MB"
+
+
+async def test_postgres_session_settings_not_local(
+    postgres_backend: FluxPostgresBackend,
+):
+    backend = dataclasses.replace(
+        postgres_backend, default_session_settings={"work_mem": "7MB"}
+    )
+
+    async with backend.connection():
+        async with backend.session_settings(
+            {"maintenance_work_mem": "123MB"}, local=False
+        ):
+            assert await backend._conn.fetch_val("show work_mem") == "7MB"
+            assert await backend._conn.fetch_val("show maintenance_work_mem") == "123MB"
+
+        assert await backend._conn.fetch_val("show work_mem") == "4MB"
+        assert await backend._conn.fetch_val("show maintenance_work_mem") == "64MB"
+
+
+async def test_postgres_session_settings_invalid_name(
+    postgres_backend: FluxPostgresBackend,
+):
+    async with postgres_backend.connection():
+        with pytest.raises(ValueError):
+            async with postgres_backend.session_settings(
+                {"work_mem; drop table x": "1MB"}
+            ):
+                pass
@@ -0,0 +1,112 @@
+import dataclasses
+import os
+
+import pytest
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.config import FluxConfig
+from flux.runner import FluxRunner
+from tests.integration.postgres.helpers import postgres_config
+
+
+@pytest.fixture
+def snapshot_config(example_project_dir: str, example_migrations_dir: str):
+    with open(
+        os.path.join(example_migrations_dir, "20200103_001_seed_simple_table.sql"), "w"
+    ) as f:
+        f.write("insert into simple_table (data) values ('seed');")
+    return dataclasses.replace(
+        postgres_config(migration_directory=example_migrations_dir),
+        snapshot_directory=os.path.join(example_project_dir, ".flux-snapshots"),
+    )
+
+
+def _backend(database_uri: str) -> FluxPostgresBackend:
+    return FluxPostgresBackend(
+        database_url=database_uri, migrations_table="_flux_migrations"
+    )
+
+
+def _snapshot_files(config: FluxConfig) -> list[str]:
+    if not os.path.exists(config.snapshot_directory):
+        return []
+    return sorted(os.listdir(config.snapshot_directory))
+
+
+async def test_postgres_snapshot_restored_for_fresh_database(
+    postgres_backend: FluxPostgresBackend,
+    snapshot_config: FluxConfig,
+    create_database_uri,
+):
+    async with FluxRunner(config=snapshot_config, backend=postgres_backend) as runner:
+        assert runner.fresh_database is True
+        await runner.apply_migrations()
+        snapshot_file = f"{runner.snapshot_key()}.sql"
+
+    assert _snapshot_files(snapshot_config) == [snapshot_file]
+    with open(os.path.join(snapshot_config.snapshot_directory, snapshot_file)) as f:
+        snapshot = f.read()
+    assert "INSERT INTO public.simple_table" in snapshot
+    assert "_flux_migrations" not in snapshot
+
+    # Mark the snapshot so restoring it can be told apart from replaying
+    with open(
+        os.path.join(snapshot_config.snapshot_directory, snapshot_file), "a"
+    ) as f:
+        f.write("\ncreate table restored_from_snapshot (id int);\n")
+
+    fresh_backend = _backend(await create_database_uri())
+    async with FluxRunner(config=snapshot_config, backend=fresh_backend) as runner:
+        await runner.apply_migrations()
+
+        assert runner.list_unapplied_migrations() == []
+        assert await fresh_backend._conn.fetch_val(
+            "select to_regclass('restored_from_snapshot') is not null"
+        )
+        assert (
+            await fresh_backend._conn.fetch_val("select data from simple_table")
+            == "seed"
+        )
+        assert await fresh_backend.get_applied_repeatable_migrations("post-apply") == {
+            m.id: m.up_hash for m in runner.post_apply_migrations
+        }
+
+    async with FluxRunner(config=snapshot_config, backend=fresh_backend) as runner:
+        assert runner.fresh_database is False
+        await runner.validate_applied_migrations()
+
+
+async def test_postgres_snapshot_keyed_by_migrations(
+    postgres_backend: FluxPostgresBackend,
+    snapshot_config: FluxConfig,
+    create_database_uri,
+):
+    async with FluxRunner(config=snapshot_config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+        first_key = runner.snapshot_key()
+
+    with open(
+        os.path.join(snapshot_config.migration_directory, "20200104_001_more.sql"), "w"
+    ) as f:
+        f.write("create table more_table (id int);")
+
+    fresh_backend = _backend(await create_database_uri())
+    async with FluxRunner(config=snapshot_config, backend=fresh_backend) as runner:
+        assert runner.snapshot_key() != first_key
+        assert await runner.restore_snapshot() is False
+        await runner.apply_migrations()
+
+        assert _snapshot_files(snapshot_config) == sorted(
+            [f"{first_key}.sql", f"{runner.snapshot_key()}.sql"]
+        )
+
+
+async def test_postgres_snapshot_not_saved_for_partial_apply(
+    postgres_backend: FluxPostgresBackend,
+    snapshot_config: FluxConfig,
+):
+    async with FluxRunner(config=snapshot_config, backend=postgres_backend) as runner:
+        await runner.apply_migrations(n=1)
+        await runner.apply_migrations()
+
+    assert _snapshot_files(snapshot_config) == []
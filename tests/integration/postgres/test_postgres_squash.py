@@ -0,0 +1,183 @@
+import os
+
+import pytest
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.cli import app
+from flux.exceptions import MigrationDirectoryCorruptedError, MigrationSquashError
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.helpers import postgres_config
+
+SQUASH_UNTIL = "20200102_001_add_timestamp_to_another_table"
+SQUASHED_IDS = [
+    "20200101_000_create_tables",
+    "20200101_001_add_description_to_simple_table",
+    "20200102_001_add_timestamp_to_another_table",
+]
+LATER_ID = "20200102_002_create_new_table"
+
+
+@pytest.fixture
+def squash_migrations_dir(example_migrations_dir: str) -> str:
+    """
+    Example migrations whose tables are created by a migration rather than by
+    pre-apply migrations, as a baseline replaces migrations only
+    """
+    pre_apply_dir = os.path.join(example_migrations_dir, "pre-apply")
+    for filename in os.listdir(pre_apply_dir):
+        if "ensure" in filename:
+            os.remove(os.path.join(pre_apply_dir, filename))
+    with open(
+        os.path.join(example_migrations_dir, "20200101_000_create_tables.sql"), "w"
+    ) as f:
+        f.write(
+            """
+            create table simple_table (id serial primary key, data text);
+            create table another_table (id serial primary key, value integer);
+            create function simple_table_count() returns bigint
+            language sql begin atomic select count(*) from simple_table; end;
+            """
+        )
+    return example_migrations_dir
+
+
+def _backend(database_uri: str) -> FluxPostgresBackend:
+    return FluxPostgresBackend(
+        database_url=database_uri, migrations_table="_flux_migrations"
+    )
+
+
+async def _squash(migrations_dir: str, scratch_database_uri: str):
+    """
+    Squash migrations as ``flux squash`` does
+    """
+    config = postgres_config(migration_directory=migrations_dir)
+    async with FluxRunner(
+        config=config, backend=_backend(scratch_database_uri)
+    ) as runner:
+        baseline = await runner.squash_migrations(until=SQUASH_UNTIL)
+
+    with open(os.path.join(migrations_dir, f"{SQUASH_UNTIL}.baseline.sql"), "w") as f:
+        f.write(baseline.up)
+    for filename in os.listdir(migrations_dir):
+        if any(filename.startswith(f"{m}.") for m in SQUASHED_IDS):
+            if not filename.endswith(".baseline.sql"):
+                os.remove(os.path.join(migrations_dir, filename))
+    return baseline
+
+
+async def test_postgres_squash_migrations(
+    postgres_backend: FluxPostgresBackend,
+    squash_migrations_dir: str,
+    create_database_uri,
+):
+    config = postgres_config(migration_directory=squash_migrations_dir)
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations()
+
+    baseline = await _squash(squash_migrations_dir, await create_database_uri())
+
+    assert list(baseline.squashed) == SQUASHED_IDS
+    assert baseline.squashed[SQUASH_UNTIL] == next(
+        m.up_hash for m in runner.migrations if m.id == SQUASH_UNTIL
+    )
+    assert baseline.settings == {"check_function_bodies": "off"}
+    assert "CREATE TABLE public.simple_table" in baseline.up
+    assert '"timestamp" text' in baseline.up
+    assert "CREATE FUNCTION public.simple_table_count()" in baseline.up
+    assert "new_table" not in baseline.up
+    assert "_flux_migrations" not in baseline.up
+    assert not any(line.startswith("SET ") for line in baseline.up.splitlines())
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        assert [m.id for m in runner.migrations] == [SQUASH_UNTIL, LATER_ID]
+        await runner.validate_applied_migrations()
+        assert runner.list_unapplied_migrations() == []
+
+    fresh_backend = _backend(await create_database_uri())
+    async with FluxRunner(config=config, backend=fresh_backend) as runner:
+        await runner.apply_migrations()
+        assert {m.id for m in runner.applied_migrations} == {SQUASH_UNTIL, LATER_ID}
+
+        columns = await fresh_backend._conn.fetch_all(
+            "select column_name from information_schema.columns "
+            "where table_name = 'another_table' order by ordinal_position"
+        )
+        assert [row[0] for row in columns] == ["id", "value", "timestamp"]
+
+    async with FluxRunner(config=config, backend=fresh_backend) as runner:
+        await runner.validate_applied_migrations()
+
+        await runner.rollback_migrations()
+        assert runner.applied_migrations == set()
+
+
+async def test_postgres_squash_migrations_partly_applied(
+    postgres_backend: FluxPostgresBackend,
+    squash_migrations_dir: str,
+    create_database_uri,
+):
+    config = postgres_config(migration_directory=squash_migrations_dir)
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        await runner.apply_migrations(n=2)
+
+    await _squash(squash_migrations_dir, await create_database_uri())
+
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        with pytest.raises(MigrationDirectoryCorruptedError) as exc_info:
+            await runner.validate_applied_migrations()
+
+    assert SQUASH_UNTIL in str(exc_info.value)
+
+
+async def test_postgres_squash_migrations_needs_empty_database(
+    postgres_backend: FluxPostgresBackend,
+    squash_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=squash_migrations_dir)
+    async with FluxRunner(config=config, backend=postgres_backend) as runner:
+        with pytest.raises(MigrationSquashError):
+            await runner.squash_migrations(until="20200101_000_missing")
+
+        await runner.apply_migrations(n=1)
+        with pytest.raises(MigrationSquashError):
+            await runner.squash_migrations(until=SQUASH_UNTIL)
+
+
+async def test_cli_squash(
+    example_project_dir: str,
+    squash_migrations_dir: str,
+    database_uri: str,
+    create_database_uri,
+):
+    scratch_database_uri = await create_database_uri()
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(
+            app,
+            [
+                "squash",
+                "--until",
+                SQUASH_UNTIL,
+                "--auto-approve",
+                scratch_database_uri,
+            ],
+        )
+        assert result.exit_code == 0, result.stdout
+        assert "Squashing 3 migrations" in result.stdout
+
+        assert sorted(f for f in os.listdir(squash_migrations_dir) if "." in f) == [
+            f"{SQUASH_UNTIL}.baseline.sql",
+            f"{LATER_ID}.py",
+        ]
+
+        result = runner.invoke(app, ["apply", "--auto-approve", database_uri])
+        assert result.exit_code == 0, result.stdout
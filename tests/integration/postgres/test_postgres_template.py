@@ -0,0 +1,104 @@
+import os
+
+from typer.testing import CliRunner
+
+from flux.builtins.postgres import FluxPostgresBackend
+from flux.cli import app
+from flux.runner import FluxRunner
+from tests.helpers import change_cwd
+from tests.integration.postgres.constants import (
+    TEST_PG_CONNECTION_STRING,
+    TEST_PG_MANAGEMENT_DB,
+)
+from tests.integration.postgres.helpers import postgres_config
+
+
+def _backend(database_uri: str) -> FluxPostgresBackend:
+    return FluxPostgresBackend(
+        database_url=database_uri,
+        migrations_table="_flux_migrations",
+        maintenance_database=TEST_PG_MANAGEMENT_DB,
+    )
+
+
+async def test_postgres_template_clone(
+    template_database_uri: str,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+    template_backend = _backend(template_database_uri)
+    runner = FluxRunner(config=config, backend=template_backend)
+
+    assert await template_backend.template_key() is None
+    assert await runner.build_template() is True
+    assert await template_backend.template_key() == runner.snapshot_key()
+    assert await runner.build_template() is False
+
+    clone_uri = await runner.clone_template()
+    assert clone_uri.startswith(f"{template_database_uri}_")
+    named_clone_uri = await runner.clone_template(
+        f"{template_backend.database_name}_named"
+    )
+    assert named_clone_uri == f"{template_database_uri}_named"
+
+    for uri in [clone_uri, named_clone_uri]:
+        clone_backend = _backend(uri)
+        async with FluxRunner(config=config, backend=clone_backend) as clone_runner:
+            assert clone_runner.fresh_database is False
+            await clone_runner.validate_applied_migrations()
+            assert clone_runner.list_unapplied_migrations() == []
+            assert await clone_backend.template_key() is None
+
+
+async def test_postgres_template_rebuilt_when_migrations_change(
+    template_database_uri: str,
+    example_migrations_dir: str,
+):
+    config = postgres_config(migration_directory=example_migrations_dir)
+    template_backend = _backend(template_database_uri)
+    runner = FluxRunner(config=config, backend=template_backend)
+    await runner.build_template()
+    first_key = await template_backend.template_key()
+
+    async with template_backend.connection():
+        await template_backend._conn.execute(
+            "create table not_from_migrations (id int)"
+        )
+
+    with open(os.path.join(example_migrations_dir, "20200104_001_more.sql"), "w") as f:
+        f.write("create table more_table (id int);")
+
+    clone_backend = _backend(await runner.clone_template())
+    assert await template_backend.template_key() != first_key
+
+    async with FluxRunner(config=config, backend=clone_backend) as clone_runner:
+        assert clone_runner.list_unapplied_migrations() == []
+        assert await clone_backend._conn.fetch_val(
+            "select to_regclass('more_table') is not null"
+        )
+        assert await clone_backend._conn.fetch_val(
+            "select to_regclass('not_from_migrations') is null"
+        )
+
+
+def test_cli_template(example_project_dir: str, template_database_uri: str):
+    with change_cwd(example_project_dir):
+        runner = CliRunner()
+        result = runner.invoke(app, ["init", "postgres"])
+        assert result.exit_code == 0, result.stdout
+
+        result = runner.invoke(app, ["template", "create", template_database_uri])
+        assert result.exit_code == 0, result.stdout
+        assert "Built the template database" in result.stdout
+
+        result = runner.invoke(app, ["template", "create", template_database_uri])
+        assert result.exit_code == 0, result.stdout
+        assert "The template database is up to date" in result.stdout
+
+        clone_name = f"{template_database_uri.rsplit('/', 1)[1]}_cli"
+        result = runner.invoke(
+            app,
+            ["template", "clone", "--name", clone_name, template_database_uri],
+        )
+        assert result.exit_code == 0, result.stdout
+        assert result.stdout.strip() == f"{TEST_PG_CONNECTION_STRING}/{clone_name}"
@@ -0,0 +1 @@
+aaa up content
\ No newline at end of file
@@ -0,0 +1,5 @@
+-- flux:squashed 20200101_000_aaa 0123456789abcdef0123456789abcdef
+-- flux:squashed 20200101_001_bbb fedcba9876543210fedcba9876543210
+-- flux:set check_function_bodies = off
+
+baseline content
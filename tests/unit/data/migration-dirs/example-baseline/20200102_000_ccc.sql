@@ -0,0 +1 @@
+ccc up content
\ No newline at end of file
@@ -0,0 +1,6 @@
+group = "views"
+defines = ["view1", "public.view2"]
+
+
+def apply() -> str:
+    return "create or replace view view1 as select 1;"
@@ -0,0 +1,15 @@
+settings = {"maintenance_work_mem": "1GB"}
+
+
+def indexes() -> list[str]:
+    return [
+        "create index example_table_name_idx on example_table (name);",
+        "create index example_table_id_name_idx on example_table (id, name);",
+    ]
+
+
+def undo() -> str:
+    return """
+    drop index example_table_name_idx;
+    drop index example_table_id_name_idx;
+    """
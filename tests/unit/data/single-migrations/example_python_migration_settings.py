@@ -0,0 +1,6 @@
+phase = "contract"
+settings = {"maintenance_work_mem": "1GB", "max_parallel_maintenance_workers": 4}
+
+
+def apply() -> str:
+    return "create table example_table ( id serial primary key, name text );"
@@ -0,0 +1,5 @@
+defines = "view1"
+
+
+def apply() -> str:
+    return "create or replace view view1 as select 1;"
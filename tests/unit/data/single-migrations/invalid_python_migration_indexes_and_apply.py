@@ -0,0 +1,6 @@
+def apply() -> str:
+    return "create table example_table ( id serial primary key, name text );"
+
+
+def indexes() -> list[str]:
+    return ["create index example_table_name_idx on example_table (name);"]
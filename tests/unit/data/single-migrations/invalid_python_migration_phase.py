@@ -0,0 +1,5 @@
+phase = "deploy"
+
+
+def apply() -> str:
+    return "create table example_table ( id serial primary key, name text );"
@@ -0,0 +1,5 @@
+settings = ["maintenance_work_mem = 1GB"]
+
+
+def apply() -> str:
+    return "create table example_table ( id serial primary key, name text );"
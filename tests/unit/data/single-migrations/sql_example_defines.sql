@@ -0,0 +1,3 @@
+-- flux:defines view1, public.view2
+-- flux:defines count_rows
+create or replace view view1 as select 1;
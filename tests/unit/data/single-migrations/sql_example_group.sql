@@ -0,0 +1,2 @@
+-- flux:group grants
+grant select on all tables in schema public to reporting;
@@ -0,0 +1,2 @@
+-- flux:phase expand
+create table example_table ( id serial primary key, name text );
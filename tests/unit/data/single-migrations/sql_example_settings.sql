@@ -0,0 +1,3 @@
+-- flux:set maintenance_work_mem = '1GB'
+-- flux:set max_parallel_maintenance_workers = 4
+create table example_table ( id serial primary key, name text );
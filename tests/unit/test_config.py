@@ -21,6 +21,8 @@ def test_flux_config_from_file_postgres():
     assert config.backend == "postgres"
     assert config.migration_directory == "migrations"
     assert config.log_level == "info"
+    assert config.lock_impact_threshold_bytes == 1000000
+    assert config.snapshot_directory == ".flux-snapshots"
     assert config.backend_config == {
         "host": "localhost",
         "port": 5432,
@@ -28,6 +30,7 @@ def test_flux_config_from_file_postgres():
         "password": "your_password",
         "database": "your_database",
         "sslmode": "require",
+        "session_settings": {"maintenance_work_mem": "1GB"},
     }
 
 
@@ -36,6 +39,8 @@ def test_flux_config_from_file_minimal():
     assert config.backend == "postgres"
     assert config.migration_directory == "migrations"
     assert config.log_level == "INFO"
+    assert config.lock_impact_threshold_bytes is None
+    assert config.snapshot_directory is None
     assert config.backend_config == {}
 
 
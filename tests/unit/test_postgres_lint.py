@@ -0,0 +1,132 @@
+import pytest
+
+from flux.builtins import postgres_lint
+from flux.builtins.postgres_lint import (
+    CREATE_INDEX_NOT_CONCURRENTLY,
+    FOREIGN_KEY_WITHOUT_NOT_VALID,
+    SET_NOT_NULL_WITHOUT_CHECK,
+    TABLE_REWRITE,
+    lint_migrations,
+)
+from flux.migration.migration import Migration
+
+EXAMPLE_MIGRATIONS = [
+    Migration(
+        id="20200101_001_create_tables",
+        up="""
+        create table users (id serial primary key, name text);
+        create index users_name_idx on users (name);
+        create table posts (id serial primary key, user_id int);
+        alter table posts add foreign key (user_id) references users (id);
+        """,
+        down=None,
+    ),
+    Migration(
+        id="20200102_001_index_posts",
+        up="""
+        create index posts_user_id_idx on posts (user_id);
+        create index concurrently posts_id_idx on posts (id);
+        """,
+        down=None,
+    ),
+    Migration(
+        id="20200103_001_users_name_not_null",
+        up="""
+        alter table users add constraint users_name_not_null
+            check (name is not null) not valid;
+        alter table users validate constraint users_name_not_null;
+        alter table users alter column name set not null;
+        alter table posts alter column user_id set not null;
+        """,
+        down=None,
+    ),
+    Migration(
+        id="20200104_001_posts_fk",
+        up="""
+        alter table posts add column author_id int;
+        alter table posts add constraint posts_author_fkey
+            foreign key (author_id) references users (id);
+        alter table posts add constraint posts_user_fkey
+            foreign key (user_id) references users (id) not valid;
+        alter table posts alter column user_id type bigint;
+        """,
+        down=None,
+    ),
+]
+
+
+def _summary(violations):
+    return [(v.migration_id, v.statement_index, v.rule) for v in violations]
+
+
+def test_lint_migrations():
+    violations = lint_migrations(EXAMPLE_MIGRATIONS)
+
+    assert _summary(violations) == [
+        ("20200102_001_index_posts", 0, CREATE_INDEX_NOT_CONCURRENTLY),
+        ("20200103_001_users_name_not_null", 3, SET_NOT_NULL_WITHOUT_CHECK),
+        ("20200104_001_posts_fk", 1, FOREIGN_KEY_WITHOUT_NOT_VALID),
+        ("20200104_001_posts_fk", 3, TABLE_REWRITE),
+    ]
+    assert violations[0].statement == (
+        "create index posts_user_id_idx on posts (user_id);"
+    )
+    assert violations[1].statement == (
+        "alter table posts alter column user_id set not null;"
+    )
+
+
+def test_lint_migrations_since():
+    violations = lint_migrations(
+        EXAMPLE_MIGRATIONS, since="20200103_001_users_name_not_null"
+    )
+
+    assert _summary(violations) == [
+        ("20200104_001_posts_fk", 1, FOREIGN_KEY_WITHOUT_NOT_VALID),
+        ("20200104_001_posts_fk", 3, TABLE_REWRITE),
+    ]
+
+
+def test_lint_migrations_check_from_earlier_migration():
+    migrations = [
+        Migration(
+            id="20200101_001_check",
+            up="alter table users add constraint c check (name is not null);",
+            down=None,
+        ),
+        Migration(
+            id="20200102_001_set_not_null",
+            up="alter table users alter column name set not null;",
+            down=None,
+        ),
+    ]
+
+    assert lint_migrations(migrations, since="20200101_001_check") == []
+
+
+def test_lint_migrations_ignore_comment():
+    migrations = [
+        Migration(
+            id="20200101_001_small_index",
+            up="""
+            -- flux:lint-ignore create-index-not-concurrently, table-rewrite
+            create index users_name_idx on users (name);
+            alter table users alter column name type varchar(100);
+            alter table posts add foreign key (user_id) references users (id);
+            """,
+            down=None,
+        ),
+    ]
+
+    assert _summary(lint_migrations(migrations)) == [
+        ("20200101_001_small_index", 2, FOREIGN_KEY_WITHOUT_NOT_VALID),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_lint_migrations_parallel(monkeypatch, jobs: int):
+    monkeypatch.setattr(postgres_lint, "PARALLEL_THRESHOLD", 0)
+
+    violations = lint_migrations(EXAMPLE_MIGRATIONS, jobs=jobs)
+
+    assert violations == lint_migrations(EXAMPLE_MIGRATIONS)
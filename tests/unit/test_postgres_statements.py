@@ -0,0 +1,219 @@
+import pytest
+
+from flux.builtins.postgres_statements import (
+    ACCESS_EXCLUSIVE,
+    ROW_EXCLUSIVE,
+    SHARE,
+    SHARE_ROW_EXCLUSIVE,
+    SHARE_UPDATE_EXCLUSIVE,
+    StatementLock,
+    classify_statement_lock,
+    is_explainable,
+    parse_index_definition,
+    split_statements,
+    split_top_level,
+    touched_tables,
+)
+
+
+def test_split_statements():
+    content = """
+    create table example_table ( id serial primary key, name text );
+
+    insert into example_table (name) values ('a');
+    -- trailing comment
+    """
+    assert split_statements(content) == [
+        "create table example_table ( id serial primary key, name text );",
+        "insert into example_table (name) values ('a');",
+    ]
+
+
+def test_split_statements_quotes_and_comments():
+    content = """
+    insert into example_table (name) values ('a;b'), (E'c\\';d'), ("e;f");
+    /* a ; comment */ create function f() returns int as $body$
+        begin return 1; end;
+    $body$ language plpgsql;
+    create rule r as on insert to t do also (insert into a values (1); select 2);
+    """
+    assert split_statements(content) == [
+        "insert into example_table (name) values ('a;b'), (E'c\\';d'), (\"e;f\");",
+        "/* a ; comment */ create function f() returns int as $body$\n"
+        "        begin return 1; end;\n"
+        "    $body$ language plpgsql;",
+        "create rule r as on insert to t do also "
+        "(insert into a values (1); select 2);",
+    ]
+
+
+def test_split_statements_begin_atomic():
+    content = """
+    create function f() returns int language sql begin atomic select 1; end;
+    select f();
+    """
+    assert split_statements(content) == [
+        "create function f() returns int language sql " "begin atomic select 1; end;",
+        "select f();",
+    ]
+
+
+def test_split_statements_trailing_comment():
+    assert split_statements("select 1;\n-- done\n/* really */\n") == ["select 1;"]
+
+
+def test_split_statements_empty():
+    assert split_statements("   \n  ") == []
+
+
+@pytest.mark.parametrize(
+    "statement, explainable",
+    [
+        ("select * from example_table;", True),
+        ("-- a comment\nselect 1;", True),
+        ("insert into example_table (name) values ('a');", True),
+        ("update example_table set name = 'b';", True),
+        ("delete from example_table;", True),
+        ("with x as (select 1) insert into example_table select * from x;", True),
+        ("create table example_table ( id serial primary key );", False),
+        ("alter table example_table add column description text;", False),
+        ("drop table example_table;", False),
+        ("create index idx on example_table (name);", False),
+        ("grant select on example_table to someone;", False),
+    ],
+)
+def test_is_explainable(statement: str, explainable: bool):
+    assert is_explainable(statement) is explainable
+
+
+def test_split_top_level():
+    assert split_top_level("a int, b numeric(10, 2), c text default 'x,y'") == [
+        "a int",
+        "b numeric(10, 2)",
+        "c text default 'x,y'",
+    ]
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "alter table users add column token uuid default gen_random_uuid();",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE, rewrites=True),
+        ),
+        (
+            "alter table users add column created_at timestamp default now();",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE),
+        ),
+        (
+            "alter table users add column id2 bigserial;",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE, rewrites=True),
+        ),
+        (
+            'ALTER TABLE public."Users" ALTER COLUMN age TYPE bigint;',
+            StatementLock(
+                table='public."Users"', lock_mode=ACCESS_EXCLUSIVE, rewrites=True
+            ),
+        ),
+        (
+            "alter table users add constraint age_positive check (age > 0);",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE, scans=True),
+        ),
+        (
+            "alter table users add constraint age_positive check (age > 0) not valid;",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE),
+        ),
+        (
+            "alter table posts add foreign key (user_id) references users (id);",
+            StatementLock(table="posts", lock_mode=SHARE_ROW_EXCLUSIVE, scans=True),
+        ),
+        (
+            "alter table posts validate constraint posts_user_id_fkey;",
+            StatementLock(table="posts", lock_mode=SHARE_UPDATE_EXCLUSIVE, scans=True),
+        ),
+        (
+            "alter table users alter column name set not null, "
+            "alter column age set statistics 100;",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE, scans=True),
+        ),
+        (
+            "create index users_name_idx on users (name);",
+            StatementLock(table="users", lock_mode=SHARE, scans=True),
+        ),
+        (
+            "create unique index concurrently if not exists users_name_idx "
+            "on only app.users using btree (name);",
+            StatementLock(
+                table="app.users", lock_mode=SHARE_UPDATE_EXCLUSIVE, scans=True
+            ),
+        ),
+        (
+            "-- Recluster\nvacuum full users;",
+            StatementLock(table="users", lock_mode=ACCESS_EXCLUSIVE, rewrites=True),
+        ),
+        (
+            "lock table users in share row exclusive mode;",
+            StatementLock(table="users", lock_mode=SHARE_ROW_EXCLUSIVE),
+        ),
+        (
+            "update users set name = lower(name);",
+            StatementLock(table="users", lock_mode=ROW_EXCLUSIVE, scans=True),
+        ),
+        (
+            "insert into users (name) values ('a');",
+            StatementLock(table="users", lock_mode=ROW_EXCLUSIVE),
+        ),
+        ("create table users (id serial primary key);", None),
+        ("select 1;", None),
+    ],
+)
+def test_classify_statement_lock(statement: str, expected: StatementLock | None):
+    assert classify_statement_lock(statement) == expected
+
+
+def test_touched_tables():
+    content = """
+    create table new_table (id serial primary key);
+    insert into new_table default values;
+    alter table "Users" add column note text;
+    update app.accounts set active = true;
+    lock table locked_table;
+    select * from selected_table;
+    create table dropped_table (id int);
+    drop table dropped_table;
+    create index users_note_idx on "Users" (note);
+    """
+    assert touched_tables(content) == ["new_table", '"Users"', "app.accounts"]
+    assert touched_tables(content, include_created=False) == [
+        '"Users"',
+        "app.accounts",
+    ]
+
+
+@pytest.mark.parametrize(
+    "statement, expected",
+    [
+        (
+            "create index users_name_idx on users (name);",
+            (
+                "users_name_idx",
+                "users",
+                "create index concurrently users_name_idx on users (name)",
+            ),
+        ),
+        (
+            "-- Unique names\nCREATE UNIQUE INDEX CONCURRENTLY users_name_idx\n"
+            "ON app.users (name) WHERE name <> '  ';",
+            (
+                "app.users_name_idx",
+                "app.users",
+                "CREATE UNIQUE INDEX CONCURRENTLY users_name_idx\n"
+                "ON app.users (name) WHERE name <> '  '",
+            ),
+        ),
+        ("create index on users (name);", None),
+        ("alter table users add column note text;", None),
+    ],
+)
+def test_parse_index_definition(statement: str, expected: tuple[str, str, str] | None):
+    assert parse_index_definition(statement) == expected
@@ -5,6 +5,8 @@ import pytest
 from flux.exceptions import MigrationLoadingError
 from flux.migration.migration import Migration
 from flux.migration.read_migration import (
+    format_baseline_migration,
+    parse_baseline_migration,
     read_migrations,
     read_post_apply_migrations,
     read_pre_apply_migrations,
@@ -21,6 +23,13 @@ EXAMPLE_SQL_WITHOUT_DOWN = "sql_example_2"
 EXAMPLE_PYTHON_DOWN_STR = "example_python_migration_down_str"
 EXAMPLE_PYTHON_DOWN_NONE = "example_python_migration_down_none"
 EXAMPLE_PYTHON_DOWN_MISSING = "example_python_migration_down_missing"
+EXAMPLE_PYTHON_SETTINGS = "example_python_migration_settings"
+EXAMPLE_SQL_SETTINGS = "sql_example_settings"
+EXAMPLE_PYTHON_INDEXES = "example_python_migration_indexes"
+EXAMPLE_SQL_PHASE = "sql_example_phase"
+EXAMPLE_SQL_DEFINES = "sql_example_defines"
+EXAMPLE_PYTHON_DEFINES = "example_python_migration_defines"
+EXAMPLE_SQL_GROUP = "sql_example_group"
 
 
 INVALID_PYTHON_DOWN_INT = "invalid_python_migration_down_int"
@@ -28,8 +37,14 @@ INVALID_PYTHON_DOWN_RAISES = "invalid_python_migration_down_raises"
 INVALID_PYTHON_UP_INT = "invalid_python_migration_up_int"
 INVALID_PYTHON_UP_MISSING = "invalid_python_migration_up_missing"
 INVALID_PYTHON_UP_RAISES = "invalid_python_migration_up_raises"
+INVALID_PYTHON_SETTINGS_LIST = "invalid_python_migration_settings_list"
+INVALID_PYTHON_INDEXES_AND_APPLY = "invalid_python_migration_indexes_and_apply"
+INVALID_PYTHON_PHASE = "invalid_python_migration_phase"
+INVALID_PYTHON_DEFINES_STR = "invalid_python_migration_defines_str"
+INVALID_PYTHON_GROUP_INT = "invalid_python_migration_group_int"
 
 EXAMPLE_FULL_MIGRATIONS_DIR = os.path.join(MIGRATION_DIRS_DIR, "example-full")
+EXAMPLE_BASELINE_MIGRATIONS_DIR = os.path.join(MIGRATION_DIRS_DIR, "example-baseline")
 
 EXAMPLE_UP_TEXT = "create table example_table ( id serial primary key, name text );"
 EXAMPLE_DOWN_TEXT = "drop table example_table;"
@@ -55,6 +70,25 @@ def test_read_sql_migration_without_undo():
     assert migration.up_hash == "a53b94e10e61374e5a20f9e361d638e2"
 
 
+def test_read_sql_migration_settings():
+    migration = read_sql_migration(
+        config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+        migration_id=EXAMPLE_SQL_SETTINGS,
+    )
+    assert migration.settings == {
+        "maintenance_work_mem": "1GB",
+        "max_parallel_maintenance_workers": "4",
+    }
+
+
+def test_read_sql_migration_phase():
+    migration = read_sql_migration(
+        config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+        migration_id=EXAMPLE_SQL_PHASE,
+    )
+    assert migration.phase == "expand"
+
+
 def test_read_sql_migration_not_exist():
     with pytest.raises(MigrationLoadingError):
         read_sql_migration(
@@ -73,6 +107,57 @@ def test_read_python_migration_down_str():
     assert migration.up_hash == "2ea715441b43f1bdc8428238385bb592"
 
 
+def test_read_python_migration_settings():
+    migration = read_python_migration(
+        config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+        migration_id=EXAMPLE_PYTHON_SETTINGS,
+    )
+    assert migration.settings == {
+        "maintenance_work_mem": "1GB",
+        "max_parallel_maintenance_workers": 4,
+    }
+    assert migration.phase == "contract"
+
+
+def test_read_python_migration_invalid_phase():
+    with pytest.raises(MigrationLoadingError):
+        read_python_migration(
+            config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+            migration_id=INVALID_PYTHON_PHASE,
+        )
+
+
+def test_read_python_migration_invalid_settings():
+    with pytest.raises(MigrationLoadingError):
+        read_python_migration(
+            config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+            migration_id=INVALID_PYTHON_SETTINGS_LIST,
+        )
+
+
+def test_read_python_migration_indexes():
+    migration = read_python_migration(
+        config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+        migration_id=EXAMPLE_PYTHON_INDEXES,
+    )
+    assert migration.up == ""
+    assert migration.indexes == [
+        "create index example_table_name_idx on example_table (name);",
+        "create index example_table_id_name_idx on example_table (id, name);",
+    ]
+    assert migration.settings == {"maintenance_work_mem": "1GB"}
+    assert migration.down is not None
+    assert migration.up_hash == "df2113bd43fc6dea7be9d30be3e4ae00"
+
+
+def test_read_python_migration_indexes_and_apply():
+    with pytest.raises(MigrationLoadingError):
+        read_python_migration(
+            config=in_memory_config(migration_directory=MIGRATIONS_DIR),
+            migration_id=INVALID_PYTHON_INDEXES_AND_APPLY,
+        )
+
+
 def test_read_python_migration_down_missing():
     migration = read_python_migration(
         config=in_memory_config(migration_directory=MIGRATIONS_DIR),
@@ -135,6 +220,46 @@ def test_read_repeatable_python_migration():
     assert migration.up_hash == "2ea715441b43f1bdc8428238385bb592"
 
 
+def test_read_repeatable_sql_migration_defines():
+    migration = read_repeatable_sql_migration(
+        config=in_memory_config(migration_directory=DATA_DIR),
+        migration_subdir="single-migrations",
+        migration_id=EXAMPLE_SQL_DEFINES,
+    )
+    assert migration.defines == ["view1", "public.view2", "count_rows"]
+
+
+def test_read_repeatable_python_migration_defines():
+    migration = read_repeatable_python_migration(
+        config=in_memory_config(migration_directory=DATA_DIR),
+        migration_subdir="single-migrations",
+        migration_id=EXAMPLE_PYTHON_DEFINES,
+    )
+    assert migration.defines == ["view1", "public.view2"]
+    assert migration.group == "views"
+
+
+def test_read_repeatable_sql_migration_group():
+    migration = read_repeatable_sql_migration(
+        config=in_memory_config(migration_directory=DATA_DIR),
+        migration_subdir="single-migrations",
+        migration_id=EXAMPLE_SQL_GROUP,
+    )
+    assert migration.group == "grants"
+
+
+@pytest.mark.parametrize(
+    "invalid_migration", [INVALID_PYTHON_DEFINES_STR, INVALID_PYTHON_GROUP_INT]
+)
+def test_read_repeatable_python_migration_invalid_attributes(invalid_migration: str):
+    with pytest.raises(MigrationLoadingError):
+        read_repeatable_python_migration(
+            config=in_memory_config(migration_directory=DATA_DIR),
+            migration_subdir="single-migrations",
+            migration_id=invalid_migration,
+        )
+
+
 @pytest.mark.parametrize(
     "invalid_migration",
     [
@@ -188,6 +313,41 @@ def test_read_migrations():
     ]
 
 
+def test_read_migrations_baseline():
+    migrations = read_migrations(
+        config=in_memory_config(migration_directory=EXAMPLE_BASELINE_MIGRATIONS_DIR)
+    )
+    assert [m.id for m in migrations] == ["20200101_001_bbb", "20200102_000_ccc"]
+
+    baseline = migrations[0]
+    assert baseline.is_baseline
+    assert baseline.down is None
+    assert baseline.squashed == {
+        "20200101_000_aaa": "0123456789abcdef0123456789abcdef",
+        "20200101_001_bbb": "fedcba9876543210fedcba9876543210",
+    }
+    assert baseline.settings == {"check_function_bodies": "off"}
+    assert not migrations[1].is_baseline
+
+
+def test_parse_baseline_migration_roundtrip():
+    squashed = {"20200101_000_aaa": "0123456789abcdef0123456789abcdef"}
+    content = format_baseline_migration(squashed, "baseline content\n")
+    migration = parse_baseline_migration(
+        migration_id="20200101_000_aaa", content=content
+    )
+    assert migration.squashed == squashed
+    assert migration.up == content
+
+
+def test_parse_baseline_migration_invalid():
+    with pytest.raises(MigrationLoadingError):
+        parse_baseline_migration(
+            migration_id="20200101_001_bbb",
+            content="-- flux:squashed 20200101_000_aaa 0123\n",
+        )
+
+
 def test_read_pre_apply_migrations():
     migrations = read_pre_apply_migrations(
         config=in_memory_config(migration_directory=EXAMPLE_FULL_MIGRATIONS_DIR)
@@ -0,0 +1,47 @@
+from flux.migration.migration import Migration
+from flux.migration.snapshot import read_snapshot, snapshot_key, write_snapshot
+from tests.helpers import example_config
+
+MIGRATIONS = [
+    Migration(id="20200101_000_aaa", up="aaa up content", down=None),
+    Migration(id="20200101_001_bbb", up="bbb up content", down="bbb down"),
+]
+
+
+def _key(migrations: list[Migration], backend: str = "postgres") -> str:
+    return snapshot_key(
+        backend=backend,
+        pre_apply_migrations=[],
+        migrations=migrations,
+        post_apply_migrations=[],
+    )
+
+
+def test_snapshot_key():
+    assert _key(MIGRATIONS) == _key(list(MIGRATIONS))
+    assert _key(MIGRATIONS) != _key(MIGRATIONS[:1])
+    assert _key(MIGRATIONS) != _key(MIGRATIONS, backend="other")
+    assert _key(MIGRATIONS) != _key(
+        [MIGRATIONS[0], Migration(id="20200101_001_bbb", up="changed", down=None)]
+    )
+    assert _key(MIGRATIONS) != snapshot_key(
+        backend="postgres",
+        pre_apply_migrations=MIGRATIONS[:1],
+        migrations=MIGRATIONS[1:],
+        post_apply_migrations=[],
+    )
+
+
+def test_write_and_read_snapshot(tmp_path):
+    config = example_config(backend="postgres", migration_directory="migrations")
+    config.snapshot_directory = str(tmp_path / "snapshots")
+
+    assert read_snapshot(config=config, key="abc") is None
+
+    content = "-- flux:set check_function_bodies = off\ncreate table t (id int);\n"
+    write_snapshot(config=config, key="abc", content=content)
+
+    snapshot = read_snapshot(config=config, key="abc")
+    assert snapshot is not None
+    assert snapshot.up == content
+    assert snapshot.settings == {"check_function_bodies": "off"}